@@ -0,0 +1,69 @@
+"""
+Journal Benchmark
+Compares per-operation cost of full-rewrite and journaled persistence in
+TodoListCLI as the number of stored tasks grows
+
+Usage: python benchmarks/bench_journal.py [--sizes 1000 10000 100000] [--ops 200]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_cli import TodoListCLI
+
+
+def make_tasks(count):
+    """Build a synthetic task list"""
+    return [{
+        'id': i,
+        'title': f'Task {i}',
+        'description': f'Synthetic task number {i}',
+        'priority': ('Low', 'Medium', 'High')[i % 3],
+        'status': 'Completed' if i % 4 == 0 else 'Pending',
+        'created_at': '2024-01-01 09:00:00',
+        'completed_at': '2024-01-02 09:00:00' if i % 4 == 0 else None,
+        'due_at': f'2024-01-{i // 2 % 28 + 1:02d} 23:59:59' if i % 2 == 0 else None,
+        'tags': [('backend', 'frontend', 'docs')[i % 3]] + (['blocked'] if i % 7 == 0 else [])
+    } for i in range(1, count + 1)]
+
+
+def time_adds(filename, journal, ops):
+    """Return the mean seconds per add_task call"""
+    todo = TodoListCLI(filename, journal=journal)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(ops):
+            todo.add_task(f'Benchmark {i}', 'added by bench_journal', 'High')
+    elapsed = time.perf_counter() - start
+    todo.close()
+    return elapsed / ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--ops', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'Tasks':>10} {'Rewrite (ms/op)':>17} {'Journal (ms/op)':>17}")
+    for size in args.sizes:
+        row = []
+        for journal in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                filename = os.path.join(tmp, 'tasks.json')
+                with open(filename, 'w') as file:
+                    json.dump(make_tasks(size), file, indent=4)
+                row.append(time_adds(filename, journal, args.ops) * 1000)
+        print(f"{size:>10} {row[0]:>17.3f} {row[1]:>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
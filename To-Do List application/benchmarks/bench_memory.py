@@ -0,0 +1,79 @@
+"""
+Memory Benchmark
+Compares the memory held by tasks loaded as plain dicts and as Task records,
+and what the records cost in load time (parsing the JSON included)
+
+Usage: python benchmarks/bench_memory.py [--sizes 100000 1000000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_model import Task
+
+
+def make_json(count):
+    """Build a synthetic task file as a JSON string"""
+    return json.dumps({'next_id': count + 1, 'tasks': [{
+        'id': i,
+        'title': f'Task {i}',
+        'description': f'Synthetic task number {i}',
+        'priority': ('Low', 'Medium', 'High')[i % 3],
+        'status': 'Completed' if i % 4 == 0 else 'Pending',
+        'created_at': '2024-01-01 09:00:00',
+        'completed_at': '2024-01-02 09:00:00' if i % 4 == 0 else None
+    } for i in range(1, count + 1)]})
+
+
+def as_dicts(items):
+    return {item['id']: item for item in items}
+
+
+def as_records(items):
+    return {item['id']: Task.from_dict(item) for item in items}
+
+
+def measure(text, build):
+    """Return (bytes held after loading, seconds to load)"""
+    gc.collect()
+    # Timed without tracemalloc, which slows every allocation down
+    start = time.perf_counter()
+    tasks = build(json.loads(text)['tasks'])
+    elapsed = time.perf_counter() - start
+    del tasks
+    gc.collect()
+    tracemalloc.start()
+    tasks = build(json.loads(text)['tasks'])
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'Tasks':>10} {'Dict (B/task)':>15} {'Task (B/task)':>15} "
+          f"{'Dict load (s)':>15} {'Task load (s)':>15} {'Memory':>8} {'Load':>8}")
+    for size in args.sizes:
+        text = make_json(size)
+        dict_bytes, dict_time = measure(text, as_dicts)
+        task_bytes, task_time = measure(text, as_records)
+        # Records trade load time (timestamps are parsed) for memory
+        print(f"{size:>10} {dict_bytes / size:>15.0f} {task_bytes / size:>15.0f} "
+              f"{dict_time:>15.2f} {task_time:>15.2f} "
+              f"{task_bytes / dict_bytes:>7.2f}x {task_time / dict_time:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
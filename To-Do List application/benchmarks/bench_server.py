@@ -0,0 +1,133 @@
+"""
+Server Load Test
+Starts todo_server on a temporary task file and drives it with many
+concurrent keep-alive clients, reporting requests per second and latency
+
+Usage: python benchmarks/bench_server.py [--tasks 10000] [--clients 200] [--seconds 10] [--writes 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_journal import make_tasks
+
+
+async def request(reader, writer, method, target, body=None, headers=None):
+    """Send one request on a keep-alive connection and return (status, headers, body)"""
+    payload = json.dumps(body).encode() if body is not None else b''
+    lines = [f'{method} {target} HTTP/1.1', 'Host: localhost', f'Content-Length: {len(payload)}']
+    lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + payload)
+    status = int((await reader.readline()).split()[1])
+    received = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        received[name.strip().lower()] = value.strip()
+    length = int(received.get('content-length', 0))
+    return status, received, await reader.readexactly(length) if length else b''
+
+
+async def client(host, port, deadline, writes, task_count, latencies, counts):
+    """Issue a mix of reads and writes until deadline"""
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            roll = random.random()
+            start = time.perf_counter()
+            if roll < writes / 2:
+                kind = 'add'
+                status, _, _ = await request(reader, writer, 'POST', '/tasks',
+                                             {'title': 'Load test task', 'priority': 'High'})
+            elif roll < writes:
+                kind = 'complete'
+                status, _, _ = await request(
+                    reader, writer, 'POST', f'/tasks/{random.randint(1, task_count)}/complete')
+            else:
+                kind = 'read'
+                target = random.choice(('/stats', '/tasks?status=Pending&due=2024-01-05',
+                                        '/tasks?q=number+12', f'/tasks/{random.randint(1, task_count)}'))
+                cached = {'If-None-Match': etags[target]} if target in etags else None
+                status, received, _ = await request(reader, writer, 'GET', target, headers=cached)
+                if 'etag' in received:
+                    etags[target] = received['etag']
+            latencies.append(time.perf_counter() - start)
+            counts[kind] = counts.get(kind, 0) + 1
+            counts[status] = counts.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def load(host, port, args):
+    latencies, counts = [], {}
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    await asyncio.gather(*(client(host, port, deadline, args.writes, args.tasks, latencies, counts)
+                           for _ in range(args.clients)))
+    return time.perf_counter() - start, latencies, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10000, help="tasks stored before the test")
+    parser.add_argument('--clients', type=int, default=200, help="concurrent connections")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writes', type=float, default=0.1, help="fraction of requests that write")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'tasks.json')
+        with open(filename, 'w') as file:
+            json.dump(make_tasks(args.tasks), file)
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'todo_server.py'), '--file', filename, '--journal',
+             '--port', '0'],
+            stdout=subprocess.PIPE, text=True)
+        try:
+            banner = server.stdout.readline()
+            host, port = re.search(r'http://([^:]+):(\d+)', banner).groups()
+            elapsed, latencies, counts = asyncio.run(load(host, int(port), args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"{args.clients} clients, {args.tasks} tasks, {args.writes:.0%} writes, {elapsed:.1f} s")
+    print(f"Requests:     {total} ({counts.get('read', 0)} reads, "
+          f"{counts.get('add', 0)} adds, {counts.get('complete', 0)} completes)")
+    print(f"Throughput:   {total / elapsed:,.0f} requests/s")
+    print(f"Latency (ms): p50 {percentile(latencies, 0.5) * 1000:.2f}  "
+          f"p95 {percentile(latencies, 0.95) * 1000:.2f}  "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f}")
+    statuses = ', '.join(f'{status}: {count}' for status, count in sorted(
+        (key, value) for key, value in counts.items() if isinstance(key, int)))
+    print(f"Statuses:     {statuses}")
+    # Error responses are fast, so any of them make the numbers meaningless
+    failed = sum(count for status, count in counts.items() if isinstance(status, int) and status >= 400)
+    if failed:
+        print(f"  ✗ {failed} requests failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
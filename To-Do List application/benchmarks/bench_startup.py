@@ -0,0 +1,95 @@
+"""
+Startup Benchmark
+Measures how long each front-end takes to import, which heavy modules it
+pulls in, and the wall-clock time of short CLI commands, each in a fresh
+interpreter
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--tasks 1000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_journal import make_tasks
+
+ENTRY_POINTS = ('task_store', 'todo_cli', 'todo_server', 'todo_gui')
+# Modules only some entry points should need
+HEAVY_MODULES = ('tkinter', 'asyncio', 'sqlite3', 'gzip')
+# Entry points that must never load a module
+FORBIDDEN = {'task_store': ('tkinter', 'asyncio'), 'todo_cli': ('tkinter', 'asyncio'),
+             'todo_server': ('tkinter',)}
+
+
+def import_profile(module):
+    """Return (milliseconds to import module, names of all modules imported)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    total = None
+    names = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        name = name.strip()
+        names.add(name)
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, names
+
+
+def time_command(args, runs):
+    """Return the median wall-clock seconds of running todo_cli.py with args"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'todo_cli.py'] + args, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=1000, help="tasks in the file the commands use")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'Module':<14} {'Import ms':>10}  Loads")
+    for module in ENTRY_POINTS:
+        samples = []
+        for _ in range(args.runs):
+            total, names = import_profile(module)
+            samples.append(total)
+        loaded = [heavy for heavy in HEAVY_MODULES if heavy in names]
+        print(f"{module:<14} {statistics.median(samples):>10.1f}  {', '.join(loaded) or '-'}")
+        bad = [heavy for heavy in FORBIDDEN.get(module, ()) if heavy in names]
+        if bad:
+            print(f"  ✗ {module} should not import {', '.join(bad)}")
+            failed = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'tasks.json')
+        with open(filename, 'w') as file:
+            json.dump(make_tasks(args.tasks), file)
+        print(f"\n{'Command':<30} {'Wall ms':>10}")
+        for command in (['--help'], ['list'], ['stats'], ['next', '3'], ['add', 'Startup task']):
+            if command[0] != '--help':
+                command = ['--file', filename] + command
+            seconds = time_command(command, args.runs)
+            label = ' '.join(part for part in command if part not in ('--file', filename))
+            print(f"{label:<30} {seconds * 1000:>10.1f}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
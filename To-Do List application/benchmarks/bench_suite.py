@@ -0,0 +1,236 @@
+"""
+To-Do Engine Benchmark Suite
+Drives TodoListCLI and TodoListGUI headlessly over synthetic task files of
+increasing size and records per-operation latency percentiles, file size,
+load time and peak load memory as JSON
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000 10000 100000 1000000]
+           [--ops 200] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import tk_stub
+tk_stub.install()
+
+from bench_journal import make_tasks
+from task_file import load_task_file
+from task_model import DAY, parse_date
+from task_tags import TagQuery
+from todo_cli import TodoListCLI
+from todo_gui import TodoListGUI
+
+# Report an operation as a regression when its median slows down this much
+REGRESSION_RATIO = 1.2
+# ... and by at least this many milliseconds, so timer noise is ignored
+REGRESSION_FLOOR_MS = 0.05
+
+
+def percentiles(samples):
+    """Summarise latencies in seconds as milliseconds"""
+    ordered = sorted(samples)
+
+    def rank(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {'p50': rank(0.50), 'p90': rank(0.90), 'p99': rank(0.99),
+            'max': ordered[-1] * 1000, 'count': len(ordered)}
+
+
+def timed(func, arguments):
+    """Call func once per argument tuple and return the latencies"""
+    samples = []
+    for args in arguments:
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def write_task_file(path, size):
+    with open(path, 'w') as file:
+        json.dump({'next_id': size + 1, 'tasks': make_tasks(size)}, file, indent=4)
+
+
+def measure_load(path):
+    """Return (seconds to construct TodoListCLI, peak traced bytes while loading)"""
+    start = time.perf_counter()
+    TodoListCLI(path).close()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    tasks = load_task_file(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return seconds, peak
+
+
+def bench_cli(path, size, ops, saves, rng):
+    """Time the TodoListCLI operations on a loaded task file"""
+    todo = TodoListCLI(path, journal=True)
+    ids = rng.sample(range(1, size + 1), min(ops, size))
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        results['find_task'] = timed(todo.store.find_task, [(i,) for i in ids])
+        results['add_task'] = timed(todo.add_task, [(f'Bench {i}', 'added by bench_suite', 'High')
+                                                    for i in range(ops)])
+        results['update_task'] = timed(todo.update_task, [(i, f'Renamed {i}') for i in ids])
+        results['mark_complete'] = timed(todo.mark_complete, [(i,) for i in ids])
+        results['search_tasks'] = timed(todo.store.search_tasks, [(str(i),) for i in ids[:20]])
+        results['filter_tasks'] = timed(todo.store.filter_tasks, [('Pending',)] * min(ops, 20))
+        days = [parse_date(f'2024-01-{rng.randrange(1, 29):02d}') for _ in range(min(ops, 20))]
+        results['tasks_between'] = timed(todo.store.tasks_between, [('due_at', day, day + DAY)
+                                                              for day in days])
+        where = TagQuery('tag:backend AND NOT tag:blocked AND status:Pending')
+        results['tag_query'] = timed(todo.store.query_tasks, [(None, (), where)] * min(ops, 20))
+        results['delete_task'] = timed(todo.delete_task, [(i,) for i in ids])
+    todo.close()
+    # save_tasks rewrites the whole file; time it on its own, without the journal
+    for name in os.listdir(os.path.dirname(path)):
+        if name.startswith('tasks.json.journal'):
+            os.remove(os.path.join(os.path.dirname(path), name))
+    plain = TodoListCLI(path)
+    results['save_tasks'] = timed(plain.store.save_tasks, [()] * saves)
+    plain.close()
+    return {name: percentiles(samples) for name, samples in results.items()}
+
+
+def bench_gui(path, virtual, repeats):
+    """Time refresh_task_list with and without a changed task"""
+    start = time.perf_counter()
+    app = TodoListGUI(tk_stub.Tk(), path, virtual=virtual)
+    startup = time.perf_counter() - start
+    unchanged = timed(app.refresh_task_list, [()] * repeats)
+    changed = []
+    tasks = list(app.store.tasks.values())
+    for task in tasks[:repeats]:
+        task.update({'title': task.title + ' (edited)'})
+        changed.extend(timed(app.refresh_task_list, [()]))
+    app.store.flush()
+    return {'startup_seconds': startup,
+            'refresh_unchanged': percentiles(unchanged),
+            'refresh_changed': percentiles(changed)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, ops, saves, gui_repeats, seed):
+    rng = random.Random(seed)
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'ops': ops,
+            'seed': seed
+        },
+        'sizes': {}
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tasks.json')
+            write_task_file(path, size)
+            load_seconds, peak = measure_load(path)
+            result = {
+                'file_bytes': os.path.getsize(path),
+                'load_seconds': load_seconds,
+                'peak_load_bytes': peak,
+                'ops': bench_cli(path, size, ops, saves, rng),
+                'gui': {}
+            }
+            # A fresh, unjournaled copy so both list modes see the same tasks
+            gui_path = os.path.join(tmp, 'tasks_gui.json')
+            write_task_file(gui_path, size)
+            for mode, virtual in (('tree', False), ('virtual', True)):
+                result['gui'][mode] = bench_gui(gui_path, virtual, gui_repeats)
+        report['sizes'][str(size)] = result
+        print_size(size, result)
+    return report
+
+
+def print_size(size, result):
+    print(f"\n{size} tasks: file {result['file_bytes'] / 1e6:.1f} MB, "
+          f"load {result['load_seconds']:.2f} s, peak {result['peak_load_bytes'] / 1e6:.1f} MB")
+    print(f"  {'Operation':<26} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    rows = list(result['ops'].items())
+    for mode, gui in result['gui'].items():
+        rows.append((f'refresh ({mode})', gui['refresh_unchanged']))
+        rows.append((f'refresh ({mode}, 1 edit)', gui['refresh_changed']))
+    for name, stats in rows:
+        print(f"  {name:<26} {stats['p50']:>10.3f} {stats['p90']:>10.3f} "
+              f"{stats['p99']:>10.3f} {stats['max']:>10.3f}")
+
+
+def compare(report, baseline):
+    """Print median ratios against a baseline report and return the regressions"""
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('date')}):")
+    regressions = []
+    for size, result in report['sizes'].items():
+        old = baseline['sizes'].get(size)
+        if old is None:
+            continue
+        pairs = [(name, stats, old['ops'].get(name)) for name, stats in result['ops'].items()]
+        for mode, gui in result['gui'].items():
+            old_gui = old.get('gui', {}).get(mode, {})
+            for key in ('refresh_unchanged', 'refresh_changed'):
+                pairs.append((f'{key} ({mode})', gui[key], old_gui.get(key)))
+        for name, stats, old_stats in pairs:
+            if not old_stats or not old_stats['p50']:
+                continue
+            ratio = stats['p50'] / old_stats['p50']
+            flag = ''
+            if (ratio > REGRESSION_RATIO
+                    and stats['p50'] - old_stats['p50'] > REGRESSION_FLOOR_MS):
+                flag = '  <- slower'
+                regressions.append((size, name, ratio))
+            print(f"  {size:>8} {name:<32} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--ops', type=int, default=200, help="samples per operation")
+    parser.add_argument('--saves', type=int, default=3, help="samples of save_tasks")
+    parser.add_argument('--gui-repeats', type=int, default=10, help="samples per refresh kind")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', metavar='BASELINE', help="results JSON to compare with")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.ops, args.saves, args.gui_repeats, args.seed)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(report, json.load(file))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
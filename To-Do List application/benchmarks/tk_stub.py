@@ -0,0 +1,157 @@
+"""
+Display-free Tkinter Stand-in
+Just enough of tkinter, ttk, messagebox and simpledialog to construct
+TodoListGUI without a display, with a Treeview that keeps its rows in plain
+Python containers so benchmarks measure the application's own work
+
+Usage: import tk_stub; tk_stub.install()  (before importing todo_gui)
+"""
+
+import sys
+import types
+
+END = 'end'
+
+
+class Widget:
+    """Accepts any option or geometry call and remembers configuration"""
+
+    def __init__(self, *args, **options):
+        self._options = dict(options)
+        self._bindings = {}
+
+    def __getattr__(self, name):
+        # grid, pack, focus, heading, column, ... are accepted and ignored
+        return lambda *args, **kwargs: None
+
+    def bind(self, sequence, func, add=None):
+        self._bindings[sequence] = func
+
+    def config(self, *args, **options):
+        self._options.update(options)
+
+    configure = config
+
+    def cget(self, key):
+        return self._options.get(key)
+
+
+class Tk(Widget):
+    def after(self, ms, func=None, *args):
+        return 'after#stub'
+
+    def after_idle(self, func, *args):
+        func(*args)
+
+
+class Entry(Widget):
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.text = ''
+
+    def get(self):
+        return self.text
+
+    def insert(self, index, text):
+        self.text += text
+
+    def delete(self, first, last=None):
+        self.text = ''
+
+
+class Listbox(Widget):
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.items = []
+
+    def insert(self, index, *items):
+        self.items.extend(items)
+
+    def delete(self, first, last=None):
+        self.items = []
+
+    def curselection(self):
+        return ()
+
+
+class StringVar:
+    def __init__(self, master=None, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class Treeview(Widget):
+    """Rows in a dict, attached row order in a list"""
+
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.rows = {}
+        self.order = []
+        self._selection = ()
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.rows[iid] = {'values': values, 'tags': tags}
+        self.order.append(iid)
+        return iid
+
+    def item(self, iid, **options):
+        if options:
+            self.rows[iid].update(options)
+            return None
+        return dict(self.rows[iid])
+
+    def delete(self, *iids):
+        gone = set(iids)
+        for iid in iids:
+            del self.rows[iid]
+        self.order = [iid for iid in self.order if iid not in gone]
+
+    def set_children(self, parent, *iids):
+        self.order = list(iids)
+
+    def get_children(self, item=''):
+        return tuple(self.order)
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, *iids):
+        self._selection = iids
+
+    def winfo_height(self):
+        return 1
+
+    def cget(self, key):
+        return self._options.get(key, 10 if key == 'height' else None)
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def install():
+    """Register the stand-in modules under the tkinter names"""
+    ttk = _module('tkinter.ttk', Style=Widget, Frame=Widget, Label=Widget,
+                  LabelFrame=Widget, Button=Widget, Entry=Entry, Combobox=Widget,
+                  Scrollbar=Widget, Treeview=Treeview)
+    messagebox = _module('tkinter.messagebox',
+                         showinfo=lambda *args, **kwargs: None,
+                         showwarning=lambda *args, **kwargs: None,
+                         showerror=lambda *args, **kwargs: None,
+                         askyesno=lambda *args, **kwargs: True)
+    simpledialog = _module('tkinter.simpledialog',
+                           askstring=lambda *args, **kwargs: None,
+                           askinteger=lambda *args, **kwargs: None)
+    tkinter = _module('tkinter', END=END, Tk=Tk, Toplevel=Widget, Frame=Widget,
+                      Label=Widget, Button=Widget, Entry=Entry, Listbox=Listbox,
+                      StringVar=StringVar, ttk=ttk, messagebox=messagebox, simpledialog=simpledialog)
+    sys.modules.update({'tkinter': tkinter, 'tkinter.ttk': ttk,
+                        'tkinter.messagebox': messagebox,
+                        'tkinter.simpledialog': simpledialog})
@@ -0,0 +1,155 @@
+"""
+Task Archive for the To-Do List Application
+Completed tasks older than a cut-off move out of the task file into
+append-only gzip segments under <file>.archive/. Each segment has a small
+JSON summary with its counts and vocabulary, so statistics never decompress
+a segment and searches only open segments that can match
+"""
+
+import json
+import os
+from bisect import bisect_left
+
+from task_file import replace_file
+from task_model import Task
+from task_search import task_words, tokenize, words_match
+from task_stats import TaskStatistics
+
+ARCHIVE_SUFFIX = '.archive'
+# Completed tasks older than this many days are archived by default
+DEFAULT_ARCHIVE_DAYS = 30
+# Tasks per segment; a search decompresses at most this many per match
+SEGMENT_TASKS = 50000
+
+
+def _has_prefix(vocabulary, word):
+    """Return True if a word of the sorted vocabulary starts with word"""
+    index = bisect_left(vocabulary, word)
+    return index < len(vocabulary) and vocabulary[index].startswith(word)
+
+
+def summarize(tasks):
+    """Return the summary of a segment holding tasks"""
+    words = set()
+    for task in tasks:
+        words.update(task_words(task))
+    completed = [task.completed_at for task in tasks if task.completed_at is not None]
+    return {
+        'count': len(tasks),
+        'first_id': min(task.id for task in tasks),
+        'last_id': max(task.id for task in tasks),
+        'completed_from': min(completed, default=None),
+        'completed_to': max(completed, default=None),
+        'stats': TaskStatistics(tasks).to_dict(),
+        'words': sorted(words)
+    }
+
+
+class TaskArchive:
+    """The archive segments of one task file
+
+    Segment n is n.jsonl.gz, one JSON task per line, and its summary is
+    n.json. Segments are never rewritten; a summary is written after its
+    segment and is what makes the segment part of the archive.
+    """
+
+    def __init__(self, filename):
+        self.path = filename + ARCHIVE_SUFFIX
+        self._summaries = []
+        self._stamp = None
+
+    def summaries(self):
+        """Return (segment number, summary) pairs in segment order
+
+        Summaries are read again only when the archive directory changes.
+        """
+        try:
+            stamp = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._summaries, self._stamp = [], None
+            return self._summaries
+        if stamp != self._stamp:
+            summaries = []
+            for name in sorted(os.listdir(self.path)):
+                stem, ext = os.path.splitext(name)
+                if ext == '.json' and stem.isdigit():
+                    with open(os.path.join(self.path, name)) as file:
+                        summaries.append((int(stem), json.load(file)))
+            self._summaries, self._stamp = summaries, stamp
+        return self._summaries
+
+    def stats(self):
+        """Return the statistics of all archived tasks, from the summaries only"""
+        total = TaskStatistics()
+        for _, summary in self.summaries():
+            total += TaskStatistics.from_dict(summary['stats'])
+        return total
+
+    def __len__(self):
+        return sum(summary['count'] for _, summary in self.summaries())
+
+    def _segment_path(self, number):
+        return os.path.join(self.path, f'{number:06d}.jsonl.gz')
+
+    def add(self, tasks):
+        """Write tasks to new segments; the caller then deletes them from the task file"""
+        import gzip
+        tasks = list(tasks)
+        os.makedirs(self.path, exist_ok=True)
+        summaries = self.summaries()
+        number = summaries[-1][0] if summaries else 0
+        for start in range(0, len(tasks), SEGMENT_TASKS):
+            chunk = tasks[start:start + SEGMENT_TASKS]
+            number += 1
+            segment_path = self._segment_path(number)
+            with gzip.open(segment_path + '.tmp', 'wt', encoding='utf-8', compresslevel=6) as file:
+                for task in chunk:
+                    file.write(json.dumps(task.to_dict(), ensure_ascii=False) + '\n')
+            with open(segment_path + '.tmp', 'rb') as file:
+                os.fsync(file.fileno())
+            os.replace(segment_path + '.tmp', segment_path)
+            replace_file(os.path.join(self.path, f'{number:06d}.json'),
+                         json.dumps(summarize(chunk)))
+        return len(tasks)
+
+    def leftovers(self, tasks):
+        """Return the tasks of the last segment still in tasks
+
+        A run interrupted after writing its segment but before deleting the
+        tasks from the task file leaves them in both; the next run finishes
+        by deleting them.
+        """
+        summaries = self.summaries()
+        if not summaries:
+            return []
+        number, _ = summaries[-1]
+        return [tasks[task.id] for task in self._read(number) if task.id in tasks]
+
+    def _read(self, number):
+        # gzip is only loaded once a segment is opened; summaries are plain JSON
+        import gzip
+        with gzip.open(self._segment_path(number), 'rt', encoding='utf-8') as file:
+            for line in file:
+                yield Task.from_dict(json.loads(line))
+
+    def iter_tasks(self):
+        """Stream every archived task, oldest segment first"""
+        for number, _ in self.summaries():
+            yield from self._read(number)
+
+    def search(self, query, status=None):
+        """Yield the archived tasks matching every word of query
+
+        Segments whose vocabulary lacks a word of the query are skipped
+        without being opened.
+        """
+        words = tokenize(query)
+        if not words:
+            return
+        for number, summary in self.summaries():
+            if not all(_has_prefix(summary['words'], word) for word in words):
+                continue
+            for task in self._read(number):
+                if (words_match(task_words(task), words)
+                        and (not status or task.status == status)):
+                    yield task
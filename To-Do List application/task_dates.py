@@ -0,0 +1,159 @@
+"""
+Date Range Queries for the To-Do List Application
+Per-field sorted timestamps kept up to date per task, so the tasks due,
+created or completed between two moments are found by binary search in
+O(log n + k) instead of a scan
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from task_model import DAY, EPOCH, TIME_FIELDS, now, parse_date
+
+# Named ranges accepted wherever a date range is asked for
+RANGE_NAMES = ('overdue', 'today', 'tomorrow', 'this-week', 'next-week', 'last-week',
+               'this-month', 'last-month')
+
+
+def in_range(task, field, start=None, end=None):
+    """Return True if a task's timestamp field lies in [start, end)"""
+    value = getattr(task, field)
+    return (value is not None and (start is None or value >= start)
+            and (end is None or value < end))
+
+
+def _month_start(seconds, months=0):
+    """Seconds at the start of the month holding seconds, shifted by months"""
+    day = EPOCH + timedelta(seconds=seconds)
+    index = day.year * 12 + day.month - 1 + months
+    first = day.replace(year=index // 12, month=index % 12 + 1, day=1,
+                        hour=0, minute=0, second=0)
+    return int((first - EPOCH).total_seconds())
+
+
+def named_range(name, moment=None):
+    """Return the (start, end) seconds of a named range around moment
+
+    Weeks start on Monday. 'overdue' is everything before moment; callers
+    also restrict it to pending tasks.
+    """
+    if moment is None:
+        moment = now()
+    today = moment - moment % DAY
+    # 1970-01-01 was a Thursday, three days after a Monday
+    week = today - (today // DAY + 3) % 7 * DAY
+    ranges = {
+        'overdue': (None, moment),
+        'today': (today, today + DAY),
+        'tomorrow': (today + DAY, today + 2 * DAY),
+        'this-week': (week, week + 7 * DAY),
+        'next-week': (week + 7 * DAY, week + 14 * DAY),
+        'last-week': (week - 7 * DAY, week),
+    }
+    if name in ranges:
+        return ranges[name]
+    if name == 'this-month':
+        return _month_start(today), _month_start(today, 1)
+    if name == 'last-month':
+        return _month_start(today, -1), _month_start(today)
+    raise ValueError(f"unknown date range {name!r}")
+
+
+def parse_range(text, moment=None):
+    """Parse a range name, a 'YYYY-MM-DD' day or 'FROM..TO' into (start, end)
+
+    Both ends of FROM..TO are whole days and either may be left out, so
+    '2024-03-01..2024-03-31' covers all of March and '..2024-01-01' ends
+    with New Year's Day.
+    """
+    text = text.strip()
+    if text in RANGE_NAMES:
+        return named_range(text, moment)
+    if '..' not in text:
+        start = parse_date(text)
+        return start, start + DAY
+    first, last = text.split('..', 1)
+    start = parse_date(first) if first.strip() else None
+    end = parse_date(last) + DAY if last.strip() else None
+    if start is not None and end is not None and start >= end:
+        raise ValueError(f"range {text!r} ends before it starts")
+    return start, end
+
+
+class SortedTimes:
+    """Timestamps in ascending order with the task IDs in a parallel list
+
+    Equal timestamps are ordered by ID. Two flat lists hold no per-entry
+    tuples, which keeps a million entries to a few MB of pointers.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.ids = []
+
+    def _locate(self, value, task_id):
+        low = bisect_left(self.values, value)
+        high = bisect_right(self.values, value, low)
+        return bisect_left(self.ids, task_id, low, high)
+
+    def add(self, value, task_id):
+        index = self._locate(value, task_id)
+        self.values.insert(index, value)
+        self.ids.insert(index, task_id)
+
+    def remove(self, value, task_id):
+        index = self._locate(value, task_id)
+        if index < len(self.ids) and self.ids[index] == task_id and self.values[index] == value:
+            del self.values[index]
+            del self.ids[index]
+
+    def between(self, start=None, end=None):
+        """Return the IDs whose timestamp lies in [start, end), earliest first"""
+        low = 0 if start is None else bisect_left(self.values, start)
+        high = len(self.values) if end is None else bisect_left(self.values, end, low)
+        return self.ids[low:high]
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class TimeIndex:
+    """Sorted timestamps of every task, one SortedTimes per time field
+
+    Tasks without a value for a field (no due date, not completed) are left
+    out of that field's list.
+    """
+
+    def __init__(self, tasks=(), fields=TIME_FIELDS):
+        self.fields = fields
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Sort all tasks' timestamps from scratch, e.g. after loading"""
+        tasks = list(tasks)
+        self.times = {}
+        for field in self.fields:
+            times = SortedTimes()
+            pairs = sorted((getattr(task, field), task.id) for task in tasks
+                           if getattr(task, field) is not None)
+            times.values = [value for value, _ in pairs]
+            times.ids = [task_id for _, task_id in pairs]
+            self.times[field] = times
+
+    def add(self, task):
+        """Index a task's timestamps"""
+        for field, times in self.times.items():
+            value = getattr(task, field)
+            if value is not None:
+                times.add(value, task.id)
+
+    def remove(self, task):
+        """Forget a task's timestamps (call before they change)"""
+        for field, times in self.times.items():
+            value = getattr(task, field)
+            if value is not None:
+                times.remove(value, task.id)
+
+    def between(self, field, start=None, end=None):
+        """Return the IDs of tasks whose field lies in [start, end), earliest first"""
+        return self.times[field].between(start, end)
@@ -0,0 +1,218 @@
+"""
+Task File Format for the To-Do List Application
+Tasks are stored as {"generation": G, "next_id": N, "tasks": [...]} so that
+IDs are never reused and other processes can tell when the file was saved;
+files holding a bare task list are still read. Files are parsed
+incrementally, one task object at a time
+"""
+
+import json
+import os
+import re
+
+from task_model import Task
+
+
+WHITESPACE = re.compile(r'\s*')
+CHUNK_SIZE = 64 * 1024
+
+
+class TaskFileError(ValueError):
+    """A task file that could not be parsed; it is left as it is"""
+
+
+class TaskFileReader:
+    """Stream the Task records of a task file without reading it whole
+
+    Iterating yields tasks in file order; next_id and the other top-level
+    fields in header are known once iteration has finished. Fields named in
+    skip are dropped as soon as each task is decoded, for callers that never
+    look at them. Malformed files raise ValueError part way through.
+    """
+
+    def __init__(self, path, skip=(), chunk_size=CHUNK_SIZE, file=None):
+        self.path = path
+        self.skip = skip
+        self.chunk_size = chunk_size
+        self.next_id = 1
+        self.header = {}
+        self._opened = file
+        self._header_only = False
+        self._decoder = json.JSONDecoder()
+
+    @property
+    def generation(self):
+        """Save counter of the file; 0 for files written before it existed"""
+        return self.header.get('generation', 0)
+
+    def __iter__(self):
+        if self._opened is not None:
+            with self._opened as file:
+                yield from self._parse(file)
+        elif os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                yield from self._parse(file)
+
+    def read_header(self):
+        """Read only the fields written before the task list and return them"""
+        self._header_only = True
+        try:
+            for _ in self:
+                pass
+        finally:
+            self._header_only = False
+        return self.header
+
+    def _parse(self, file):
+        self._file = file
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        first = self._peek()
+        if first == '[':
+            if not self._header_only:
+                yield from self._tasks()
+        elif first == '{':
+            yield from self._object()
+        elif first:
+            raise ValueError(f"{self.path}: not a task file")
+
+    def _fill(self):
+        """Read another chunk, dropping the part already parsed"""
+        chunk = self._file.read(self.chunk_size)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        self._eof = not chunk
+
+    def _peek(self):
+        """Skip whitespace and return the next character ('' at the end)"""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos:self._pos + 1]
+            self._fill()
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"{self.path}: expected {char!r} at offset {self._pos}")
+        self._pos += 1
+
+    def _value(self):
+        """Decode the next JSON value, reading more of the file as needed"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # A number ending at the buffer edge may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            self._fill()
+
+    def _object(self):
+        """Walk the top-level object, streaming its task list"""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'tasks' and self._peek() == '[':
+                if self._header_only:
+                    return
+                yield from self._tasks()
+            else:
+                value = self._value()
+                if key == 'next_id':
+                    self.next_id = max(self.next_id, value)
+                else:
+                    self.header[key] = value
+            if self._peek() != ',':
+                break
+            self._pos += 1
+        self._expect('}')
+
+    def _tasks(self):
+        """Yield the elements of a task array one at a time"""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            item = self._value()
+            for name in self.skip:
+                item[name] = None
+            task = Task.from_dict(item)
+            self.next_id = max(self.next_id, task.id + 1)
+            yield task
+            if self._peek() != ',':
+                break
+            self._pos += 1
+        self._expect(']')
+
+
+def read_task_file(path):
+    """Load a task file and return (Task records keyed by ID, next ID, header)
+
+    A malformed file raises TaskFileError instead of loading as no tasks,
+    which the next save would write over it.
+    """
+    reader = TaskFileReader(path)
+    try:
+        tasks = {task.id: task for task in reader}
+    except ValueError as error:
+        raise TaskFileError(str(error)) from error
+    return tasks, reader.next_id, reader.header
+
+
+def load_task_file(path):
+    """Load a task file and return (Task records keyed by ID, next ID)"""
+    tasks, next_id, _ = read_task_file(path)
+    return tasks, next_id
+
+
+def read_header(path):
+    """Return the top-level fields of a task file, such as its generation"""
+    try:
+        return TaskFileReader(path).read_header()
+    except ValueError:
+        return {}
+
+
+def file_stamp(path):
+    """Return a value that changes whenever path is replaced or written"""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+
+def dump_task_file(file, tasks, next_id, **header):
+    """Write tasks keyed by ID and the next ID to an open file
+
+    Header fields (e.g. generation) are written first, so that they can be
+    read without parsing the tasks.
+    """
+    json.dump({**header, 'next_id': next_id,
+               'tasks': [task.to_dict() for task in tasks.values()]}, file, indent=4)
+
+
+def dumps_task_file(tasks, next_id, **header):
+    """Return the task file contents as a string"""
+    return json.dumps({**header, 'next_id': next_id,
+                       'tasks': [task.to_dict() for task in tasks.values()]}, indent=4)
+
+
+def replace_file(path, text):
+    """Write text to path atomically through a temporary file and rename"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,404 @@
+"""
+Append-only Journal for the To-Do List Application
+Mutations are appended as small JSON records next to the task file and
+folded back into the snapshot by a background compactor
+"""
+
+import json
+import os
+import threading
+
+from task_file import (TaskFileReader, dump_task_file, file_stamp, read_header,
+                       read_task_file)
+from task_lock import file_lock
+from task_model import Task
+
+
+def apply_record(tasks, record):
+    """Apply a single journal record to Task records keyed by ID"""
+    op = record['op']
+    if op == 'add':
+        task = Task.from_dict(record['task'])
+        tasks[task.id] = task
+    elif op == 'update':
+        task = tasks.get(record['id'])
+        if task:
+            task.update(record['fields'])
+    elif op == 'delete':
+        tasks.pop(record['id'], None)
+
+
+def merge_records(tasks, next_id, records):
+    """Apply records made against an older copy of the tasks
+
+    Used when another process saved first. Tasks added in the records whose
+    ID has since been handed out elsewhere get the next free ID, and later
+    records for them follow. Returns (next ID, the records as applied).
+    """
+    renumbered = {}
+    applied = []
+    for record in records:
+        if record['op'] == 'add':
+            task_id = record['task']['id']
+            if task_id < next_id:
+                renumbered[task_id] = next_id
+                record = {'op': 'add', 'task': dict(record['task'], id=next_id)}
+            next_id = max(next_id, record['task']['id'] + 1)
+        elif record['id'] in renumbered:
+            record = dict(record, id=renumbered[record['id']])
+        apply_record(tasks, record)
+        applied.append(record)
+    return next_id, applied
+
+
+def read_records(path):
+    """Yield (record, size in bytes) for each intact line of a journal file
+
+    Reading stops at the first record that is torn or unreadable.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as file:
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            yield record, len(line)
+
+
+def replay(path, tasks, next_id, truncate=False):
+    """Replay the records in a journal file and return the next free ID
+
+    When truncate is set the file is cut back to the last good record so
+    later appends do not land behind a damaged tail.
+    """
+    good = 0
+    for record, size in read_records(path):
+        apply_record(tasks, record)
+        if record['op'] == 'add':
+            next_id = max(next_id, record['task']['id'] + 1)
+        good += size
+    if truncate and os.path.exists(path) and good < os.path.getsize(path):
+        with open(path, 'r+b') as file:
+            file.truncate(good)
+    return next_id
+
+
+class JournalDelta:
+    """Journal records folded per task, to be applied to a streamed snapshot"""
+
+    def __init__(self):
+        self.added = {}
+        self.updates = {}
+        self.deleted = set()
+
+    def apply(self, record):
+        """Fold one journal record into the delta"""
+        op = record['op']
+        if op == 'add':
+            task = Task.from_dict(record['task'])
+            self.added[task.id] = task
+            self.updates.pop(task.id, None)
+            self.deleted.discard(task.id)
+        elif op == 'update':
+            task = self.added.get(record['id'])
+            if task:
+                task.update(record['fields'])
+            else:
+                self.updates.setdefault(record['id'], {}).update(record['fields'])
+        elif op == 'delete':
+            self.added.pop(record['id'], None)
+            self.updates.pop(record['id'], None)
+            self.deleted.add(record['id'])
+
+    def stream(self, tasks):
+        """Yield snapshot tasks with the delta applied, then the added tasks"""
+        added = dict(self.added)
+        for task in tasks:
+            if task.id in self.deleted:
+                continue
+            if task.id in added:
+                task = added.pop(task.id)
+            elif task.id in self.updates:
+                task.update(self.updates[task.id])
+            yield task
+        yield from added.values()
+
+
+class TaskJournal:
+    """Journaled storage for a task snapshot file
+
+    Files kept next to the snapshot:
+      <file>.journal      records appended since the last rotation
+      <file>.journal.old  rotated records being folded in by the compactor
+      <file>.journal.prev the last folded journal, kept for other processes
+                          that had not read it to the end
+      <file>.compact      snapshot being written by the compactor
+      <file>.lock         advisory lock held while the files change
+
+    Several processes may share the files: appends, rotation and the end of
+    a compaction happen under the lock, and tail() returns the records other
+    processes appended since this one last looked.
+    """
+
+    def __init__(self, filename, compact_threshold=1024 * 1024, fsync=False):
+        self.filename = filename
+        self.log_path = filename + '.journal'
+        self.old_path = filename + '.journal.old'
+        self.prev_path = filename + '.journal.prev'
+        self.compact_path = filename + '.compact'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.lock = file_lock(filename + '.lock')
+        # Held by whichever process is compacting, so others leave its files alone
+        self.compact_lock = file_lock(filename + '.compact.lock')
+        self.generation = 0
+        self._log = None
+        self._compactor = None
+        # Snapshot stamp and (inode, offset) read up to in the journal, plus
+        # the same for the rotated journal once it has been read to the end
+        self._stamp = None
+        self._position = (None, 0)
+        self._previous = None
+        self._unseen = []
+        self._stale = False
+
+    def exists(self):
+        """Return True if journal files are present next to the snapshot"""
+        return os.path.exists(self.log_path) or os.path.exists(self.old_path)
+
+    def recover(self):
+        """Finish or roll back a compaction interrupted by a crash"""
+        if not os.path.exists(self.compact_path):
+            return
+        if not self.compact_lock.acquire(blocking=False):
+            # Another process is compacting right now
+            return
+        try:
+            if os.path.exists(self.old_path):
+                # The rotated log was still present, so the compacted
+                # snapshot may be incomplete; the old files are authoritative
+                os.remove(self.compact_path)
+            elif os.path.exists(self.compact_path):
+                os.replace(self.compact_path, self.filename)
+        finally:
+            self.compact_lock.release()
+
+    def load(self):
+        """Load the snapshot, replay the journal and return (tasks, next ID)"""
+        with self.lock:
+            self.recover()
+            self._stamp = file_stamp(self.filename)
+            tasks, next_id, header = read_task_file(self.filename)
+            self.generation = header.get('generation', 0)
+            next_id = replay(self.old_path, tasks, next_id)
+            next_id = replay(self.log_path, tasks, next_id, truncate=True)
+            self._previous = _position_at_end(self.old_path)
+            self._position = _position_at_end(self.log_path) or (None, 0)
+            self._unseen = []
+            self._stale = False
+            if os.path.exists(self.old_path):
+                self._start_compaction()
+        return tasks, next_id
+
+    def tail(self):
+        """Return the records appended by other processes since the last look
+
+        Returns None if some of them were folded into a new snapshot before
+        this process read them; the caller must then load() again.
+        """
+        with self.lock:
+            records = self._tail()
+            if records is None or self._stale:
+                return None
+            records[:0] = self._unseen
+            self._unseen = []
+            return records
+
+    def _tail(self):
+        records = []
+        stamp = file_stamp(self.filename)
+        if stamp != self._stamp:
+            header = read_header(self.filename)
+            generation = header.get('generation', 0)
+            if generation != self.generation:
+                # A compaction finished; records of the journal it folded
+                # that were not read yet are still in the .prev copy
+                folded = tuple(header.get('folded') or ())
+                if generation != self.generation + 1 or not folded:
+                    return None
+                if folded != self._previous:
+                    inode, offset = self._position
+                    if inode != folded[0] or _inode(self.prev_path) != inode:
+                        return None
+                    if _read_new(self.prev_path, offset, records) != folded[1]:
+                        return None
+                    self._position = (None, 0)
+                self._previous = None
+                self.generation = generation
+            self._stamp = stamp
+        inode, offset = self._position
+        log_inode = _inode(self.log_path)
+        if inode is not None and inode != log_inode:
+            # The journal being read was rotated; finish it first
+            if _inode(self.old_path) != inode:
+                return None
+            offset = _read_new(self.old_path, offset, records)
+            self._previous = (inode, offset)
+            inode, offset = None, 0
+        if log_inode is not None:
+            if inode is None:
+                inode = log_inode
+            offset = _read_new(self.log_path, offset, records)
+        self._position = (inode, offset)
+        return records
+
+    def iter_tasks(self, skip=()):
+        """Stream tasks with the journal applied, in bounded memory
+
+        Only the journal, which compaction keeps small, is held in memory;
+        the snapshot is read one task at a time. Nothing on disk is changed.
+        """
+        delta = JournalDelta()
+        with self.lock:
+            for path in (self.old_path, self.log_path):
+                for record, _ in read_records(path):
+                    delta.apply(record)
+            snapshot = self.filename
+            if os.path.exists(self.compact_path) and not os.path.exists(self.old_path):
+                # A finished compaction that recover() has not promoted yet
+                snapshot = self.compact_path
+            # Opened under the lock so it matches the journal just read
+            file = open(snapshot, 'r') if os.path.exists(snapshot) else None
+        yield from delta.stream(TaskFileReader(snapshot, skip, file=file))
+
+    def append(self, record):
+        """Append a mutation record to the journal"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Append several mutation records with a single write"""
+        with self.lock:
+            # Records appended by others since the caller last synced are
+            # kept for its next tail()
+            unseen = self._tail()
+            if unseen is None:
+                self._stale = True
+            else:
+                self._unseen.extend(unseen)
+            if self._log is not None and _inode(self.log_path) != os.fstat(self._log.fileno()).st_ino:
+                # Another process rotated the journal
+                self._log.close()
+                self._log = None
+            if self._log is None:
+                self._log = open(self.log_path, 'a')
+            # A writer that crashed mid-line would leave our records behind a
+            # torn tail, where the next load() would cut them off with it
+            _trim_torn_tail(self.log_path)
+            self._log.write(''.join(json.dumps(record, separators=(',', ':')) + '\n'
+                                    for record in records))
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self._position = (os.fstat(self._log.fileno()).st_ino, self._log.tell())
+            if self._log.tell() >= self.compact_threshold:
+                self.rotate()
+
+    def rotate(self):
+        """Move the journal aside and compact it in the background"""
+        with self.lock:
+            if self.compacting() or os.path.exists(self.old_path):
+                return
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if os.path.exists(self.log_path):
+                if self._position[0] == _inode(self.log_path):
+                    self._previous = self._position
+                    self._position = (None, 0)
+                os.replace(self.log_path, self.old_path)
+                self._start_compaction()
+
+    def compacting(self):
+        """Return True while a background compaction is running"""
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def _start_compaction(self):
+        self._compactor = threading.Thread(target=self._compact, daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        """Fold the rotated journal into a new snapshot"""
+        with self.compact_lock:
+            if not os.path.exists(self.old_path):
+                # Another process compacted it first
+                return
+            folded = _position_at_end(self.old_path)
+            tasks, next_id, header = read_task_file(self.filename)
+            generation = header.get('generation', 0)
+            next_id = replay(self.old_path, tasks, next_id)
+            with open(self.compact_path, 'w') as file:
+                # folded tells readers which journal this snapshot includes
+                dump_task_file(file, tasks, next_id, generation=generation + 1,
+                               folded=list(folded))
+                file.flush()
+                os.fsync(file.fileno())
+            with self.lock:
+                # The compacted snapshot is durable before the rotated log
+                # goes away; recover() relies on this ordering
+                os.replace(self.old_path, self.prev_path)
+                os.replace(self.compact_path, self.filename)
+
+    def close(self):
+        """Close the journal and wait for a running compaction"""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self._compactor is not None:
+            self._compactor.join()
+
+
+def _inode(path):
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+
+def _position_at_end(path):
+    """Return (inode, size) of a journal file, or None if it does not exist"""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_ino, info.st_size)
+
+
+def _trim_torn_tail(path):
+    """Cut a journal back to its last whole record if it ends mid-line"""
+    with open(path, 'r+b') as file:
+        size = file.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        file.seek(size - 1)
+        if file.read(1) == b'\n':
+            return
+        file.truncate(sum(length for _, length in read_records(path)))
+
+
+def _read_new(path, offset, records):
+    """Append the whole records in path after offset; return the new offset"""
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            offset += len(line)
+    return offset
@@ -0,0 +1,105 @@
+"""
+Advisory File Locking for the To-Do List Application
+Processes sharing a task file hold an exclusive lock on <file>.lock while
+they read or write the shared state
+"""
+
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(path):
+    """Return the process-wide FileLock for path
+
+    Locks taken through two open handles of one file would block each
+    other even within a process, so every caller shares one instance.
+    """
+    key = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = FileLock(key)
+        return lock
+
+
+def _lock(file, blocking):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        return
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            if not blocking:
+                raise
+            time.sleep(0.05)
+
+
+def _unlock(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, re-entrant within a process
+
+    Threads of one process queue on an internal lock; other processes are
+    kept out by the operating system lock, which is released automatically
+    if the holder dies.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.depth = 0
+        self._file = None
+        self._mutex = threading.RLock()
+
+    def acquire(self, blocking=True):
+        """Take the lock; without blocking, return False if it is held"""
+        if not self._mutex.acquire(blocking):
+            return False
+        if self.depth == 0:
+            file = open(self.path, 'a+')
+            try:
+                _lock(file, blocking)
+            except OSError:
+                file.close()
+                self._mutex.release()
+                if blocking:
+                    raise
+                return False
+            self._file = file
+        self.depth += 1
+        return True
+
+    def release(self):
+        """Release one level of the lock"""
+        self.depth -= 1
+        if self.depth == 0:
+            _unlock(self._file)
+            self._file.close()
+            self._file = None
+        self._mutex.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
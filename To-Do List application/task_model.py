@@ -0,0 +1,163 @@
+"""
+Task Record for the To-Do List Application
+A compact slotted record with interned priority/status strings and integer
+timestamps, converted losslessly to and from the JSON task schema
+"""
+
+import re
+import sys
+from datetime import date, datetime, timedelta
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMAT = '%Y-%m-%d'
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+DAY = 86400
+TIME_FIELDS = ('created_at', 'completed_at', 'due_at')
+# Tags are case-folded words that may contain - . and /, e.g. 'backend' or 'q3/api'
+TAG_PATTERN = re.compile(r'[\w\-./]+')
+# Seconds at the start of each 'YYYY-MM-DD' parsed so far; a task file has
+# far fewer distinct days than timestamps
+_day_starts = {}
+# Seconds of each two-digit hour, minute and second, cheaper than int()
+_HOURS = {f'{n:02d}': n * 3600 for n in range(24)}
+_MINUTES = {f'{n:02d}': n * 60 for n in range(60)}
+_SECONDS = {f'{n:02d}': n for n in range(60)}
+
+
+def parse_time(value):
+    """Convert a 'YYYY-MM-DD HH:MM:SS' string to integer seconds
+
+    Timestamps are wall-clock times, so they are counted from 1970-01-01
+    00:00:00 without any time zone and always format back to the same string.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if len(value) == 19 and value[4] == '-' and value[13] == ':':
+        # Fast path for the format written by the application
+        start = _day_starts.get(value[:10])
+        if start is None:
+            day = date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+            start = _day_starts[value[:10]] = (day.toordinal() - EPOCH_ORDINAL) * DAY
+        try:
+            return start + _HOURS[value[11:13]] + _MINUTES[value[14:16]] + _SECONDS[value[17:19]]
+        except KeyError:
+            pass  # Not a valid time of day; strptime() explains why
+    moment = datetime.strptime(value, TIME_FORMAT)
+    return int((moment - EPOCH).total_seconds())
+
+
+def format_time(seconds):
+    """Convert integer seconds back to a 'YYYY-MM-DD HH:MM:SS' string"""
+    if seconds is None:
+        return None
+    return (EPOCH + timedelta(seconds=seconds)).strftime(TIME_FORMAT)
+
+
+def parse_date(value):
+    """Convert a 'YYYY-MM-DD' date to the seconds at the start of that day"""
+    day = datetime.strptime(value.strip(), DATE_FORMAT)
+    return (day.toordinal() - EPOCH_ORDINAL) * DAY
+
+
+def parse_due(value):
+    """Convert a due date to seconds; a bare date is due at the end of that day"""
+    value = value.strip()
+    if len(value) == len('YYYY-MM-DD'):
+        return parse_date(value) + DAY - 1
+    return parse_time(value)
+
+
+def format_due(seconds):
+    """Format a due time, leaving out the time of day of end-of-day due dates"""
+    if seconds is None:
+        return None
+    text = format_time(seconds)
+    return text[:10] if seconds % DAY == DAY - 1 else text
+
+
+def parse_tags(value):
+    """Return tags from a list or a comma/space separated string as a sorted tuple
+
+    A leading '#' is dropped, so '#Backend, urgent' gives ('backend', 'urgent').
+    """
+    if not value:
+        return ()
+    if not isinstance(value, str):
+        value = ' '.join(value)
+    return tuple(sorted({sys.intern(tag) for tag in TAG_PATTERN.findall(value.casefold())}))
+
+
+def now():
+    """Return the current wall-clock time as integer seconds"""
+    return parse_time(datetime.now().strftime(TIME_FORMAT))
+
+
+class Task:
+    """One task; use from_dict()/to_dict() at the JSON boundary"""
+
+    __slots__ = ('id', 'title', 'description', 'priority', 'status',
+                 'created_at', 'completed_at', 'due_at', 'tags')
+
+    def __init__(self, id, title, description='', priority='Medium',
+                 status='Pending', created_at=None, completed_at=None, due_at=None, tags=()):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.priority = sys.intern(priority)
+        self.status = sys.intern(status)
+        self.created_at = parse_time(created_at) if created_at is not None else now()
+        self.completed_at = parse_time(completed_at)
+        self.due_at = parse_time(due_at)
+        self.tags = parse_tags(tags)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a task from a JSON task dict"""
+        # Same as cls(...), without the defaults every loaded task would pay for
+        task = cls.__new__(cls)
+        task.id = data['id']
+        task.title = data['title']
+        task.description = data.get('description') or ''
+        task.priority = sys.intern(data.get('priority') or 'Medium')
+        task.status = sys.intern(data.get('status') or 'Pending')
+        created_at = data.get('created_at')
+        task.created_at = parse_time(created_at) if created_at is not None else now()
+        task.completed_at = parse_time(data.get('completed_at'))
+        task.due_at = parse_time(data.get('due_at'))
+        tags = data.get('tags')
+        task.tags = parse_tags(tags) if tags else ()
+        return task
+
+    def to_dict(self):
+        """Return the JSON task dict"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'priority': self.priority,
+            'status': self.status,
+            'created_at': format_time(self.created_at),
+            'completed_at': format_time(self.completed_at),
+            'due_at': format_time(self.due_at),
+            'tags': list(self.tags)
+        }
+
+    def update(self, fields):
+        """Set fields from a dict; timestamps may be strings or seconds"""
+        for name, value in fields.items():
+            if name in TIME_FIELDS:
+                value = parse_time(value)
+            elif name in ('priority', 'status'):
+                value = sys.intern(value)
+            elif name == 'tags':
+                value = parse_tags(value)
+            setattr(self, name, value)
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.title!r}, status={self.status!r})"
@@ -0,0 +1,68 @@
+"""
+"Next Up" Scheduling for the To-Do List Application
+A heap of pending tasks ordered by priority and age, kept up to date per
+task so the next few tasks are found without sorting the whole list
+"""
+
+import heapq
+
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+
+def queue_key(task):
+    """Sort key for scheduling: higher priority first, then oldest first"""
+    return (PRIORITY_RANK.get(task.priority, len(PRIORITY_RANK)), task.created_at, task.id)
+
+
+class TaskQueue:
+    """Priority queue of pending task IDs with lazy deletion
+
+    Removing a task only forgets its current key; heap entries that no
+    longer match are dropped when they reach the top, and the heap is
+    rebuilt once stale entries outnumber live ones.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Queue all pending tasks from scratch, e.g. after loading"""
+        self.keys = {task.id: queue_key(task) for task in tasks
+                     if task.status == 'Pending'}
+        self._heapify()
+
+    def _heapify(self):
+        self.heap = list(self.keys.values())
+        heapq.heapify(self.heap)
+
+    def add(self, task):
+        """Queue a task if it is pending"""
+        if task.status != 'Pending':
+            return
+        key = queue_key(task)
+        self.keys[task.id] = key
+        heapq.heappush(self.heap, key)
+
+    def remove(self, task):
+        """Dequeue a task"""
+        if self.keys.pop(task.id, None) is not None and len(self.heap) > 2 * len(self.keys) + 64:
+            self._heapify()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def top(self, count):
+        """Return the IDs of the first count tasks in O(count log n)"""
+        heap = self.heap
+        found = []
+        taken = set()
+        while heap and len(found) < count:
+            key = heapq.heappop(heap)
+            task_id = key[-1]
+            # Skip entries for removed tasks and duplicates of a re-added key
+            if self.keys.get(task_id) == key and task_id not in taken:
+                found.append(key)
+                taken.add(task_id)
+        for key in found:
+            heapq.heappush(heap, key)
+        return [key[-1] for key in found]
@@ -0,0 +1,72 @@
+"""
+Write-behind Saving for the To-Do List GUI
+Changes mark the task file dirty; a worker thread writes it once the
+changes have gone quiet, so bursts of edits cost a single write
+"""
+
+import queue
+import threading
+import time
+
+
+class BackgroundSaver:
+    """Debounce calls to a write function onto a worker thread
+
+    Exceptions raised by write() are put on the errors queue for the
+    main loop to report.
+    """
+
+    def __init__(self, write, delay=0.5):
+        self.write = write
+        self.delay = delay
+        self.errors = queue.Queue()
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._last_change = 0.0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        """Note that the data changed and schedule a write"""
+        with self._cond:
+            self._dirty = True
+            self._last_change = time.monotonic()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty and not self._stopping:
+                    self._cond.wait()
+                # Wait until no change has arrived for `delay` seconds
+                while self._dirty and not self._stopping:
+                    remaining = self._last_change + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopping:
+                    return
+                self._dirty = False
+            self._write()
+
+    def _write(self):
+        try:
+            self.write()
+        except Exception as error:
+            self.errors.put(error)
+            with self._cond:
+                # Retry after another quiet period
+                self._dirty = True
+                self._last_change = time.monotonic()
+
+    def flush(self):
+        """Stop the worker and write any pending change on this thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+        with self._cond:
+            dirty, self._dirty = self._dirty, False
+        if dirty:
+            self._write()
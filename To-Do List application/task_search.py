@@ -0,0 +1,100 @@
+"""
+Full-text Search for the To-Do List Application
+An inverted index over task titles and descriptions with case-folded,
+prefix-matched keywords
+"""
+
+import re
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split text into case-folded word tokens"""
+    return TOKEN_PATTERN.findall(text.casefold()) if text else []
+
+
+def task_words(task):
+    """Return the set of word tokens in a task's title and description"""
+    return frozenset(tokenize(task.title) + tokenize(task.description))
+
+
+def words_match(tokens, words):
+    """Return True if every query word starts one of tokens"""
+    return all(any(token.startswith(word) for token in tokens) for word in words)
+
+
+class SearchIndex:
+    """Inverted index from word to task IDs, kept up to date per task
+
+    Every word of a query must match the start of some word in the task's
+    title or description, so 'rep fin' finds 'Finish the report'.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Index all tasks from scratch, e.g. after loading"""
+        postings = self.postings = {}
+        task_tokens = self.task_tokens = {}
+        for task in tasks:
+            tokens = task_tokens[task.id] = task_words(task)
+            for token in tokens:
+                ids = postings.get(token)
+                if ids is None:
+                    ids = postings[token] = set()
+                ids.add(task.id)
+        # Sort the vocabulary once; insort per new word would be quadratic
+        self.vocabulary = sorted(postings)
+
+    def add(self, task):
+        """Index one task"""
+        tokens = task_words(task)
+        self.task_tokens[task.id] = tokens
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                insort(self.vocabulary, token)
+            ids.add(task.id)
+
+    def remove(self, task):
+        """Drop one task from the index"""
+        for token in self.task_tokens.pop(task.id, ()):
+            ids = self.postings[token]
+            ids.discard(task.id)
+            if not ids:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def _prefix_ids(self, prefix):
+        """Union of the IDs of all words starting with prefix"""
+        vocabulary = self.vocabulary
+        index = bisect_left(vocabulary, prefix)
+        matches = []
+        while index < len(vocabulary) and vocabulary[index].startswith(prefix):
+            matches.append(self.postings[vocabulary[index]])
+            index += 1
+        if len(matches) == 1:
+            return matches[0]
+        return set().union(*matches)
+
+    def search(self, query):
+        """Return the sorted IDs of tasks matching every word of query"""
+        words = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not words:
+            return []
+        # Longer prefixes match fewer words, so start from those
+        result = None
+        for word in words:
+            ids = self._prefix_ids(word)
+            result = set(ids) if result is None else result & ids
+            if not result:
+                return []
+        return sorted(result)
+
+    def matches(self, task_id, query):
+        """Return True if an indexed task matches query"""
+        return words_match(self.task_tokens.get(task_id, ()), tokenize(query))
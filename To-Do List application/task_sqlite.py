@@ -0,0 +1,226 @@
+"""
+SQLite Storage for the To-Do List Application
+An optional task store backed by the standard library sqlite3 module, with
+indexes on status, priority, creation time and due date
+
+Migrate an existing JSON task file with:
+    python task_sqlite.py tasks.json tasks.db
+"""
+
+import argparse
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+from task_journal import TaskJournal
+from task_model import TIME_FIELDS, Task, format_time, parse_tags
+from task_stats import TaskStatistics
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+COLUMNS = ('id', 'title', 'description', 'priority', 'status',
+           'created_at', 'completed_at', 'due_at', 'tags')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'Medium',
+    status TEXT NOT NULL DEFAULT 'Pending',
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    due_at TEXT,
+    tags TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+"""
+
+# Run after the due_at column has been added to databases created without it
+DUE_INDEX = 'CREATE INDEX IF NOT EXISTS idx_tasks_due_at ON tasks(due_at)'
+
+
+def is_sqlite_path(filename):
+    """Return True if the filename names a SQLite task database"""
+    return filename.lower().endswith(SQLITE_SUFFIXES)
+
+
+def _column_value(column, value):
+    """Convert a task field to its column value"""
+    if column in TIME_FIELDS:
+        return format_time(value)
+    if column == 'tags':
+        # Tags never contain spaces
+        return ' '.join(parse_tags(value))
+    return value
+
+
+def row_values(task):
+    """Return a task's values in COLUMNS order"""
+    return [_column_value(column, getattr(task, column)) for column in COLUMNS]
+
+
+class SQLiteTaskStore(MutableMapping):
+    """Tasks keyed by ID, stored in a SQLite database
+
+    Reading a task returns a new Task record; changes to it are written
+    back with update_task(). Timestamps are stored as text in the JSON
+    format, which sorts chronologically, and tags as one space-separated
+    string.
+    """
+
+    def __init__(self, path):
+        # Imported here so JSON task files never load sqlite3
+        import sqlite3
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')]
+        if 'due_at' not in columns:
+            self.conn.execute('ALTER TABLE tasks ADD COLUMN due_at TEXT')
+        if 'tags' not in columns:
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN tags TEXT NOT NULL DEFAULT ''")
+        self.conn.execute(DUE_INDEX)
+        self.conn.commit()
+        self._batch_depth = 0
+
+    def __getitem__(self, task_id):
+        row = self.conn.execute('SELECT * FROM tasks WHERE id = ?',
+                                (task_id,)).fetchone()
+        if row is None:
+            raise KeyError(task_id)
+        return Task(*row)
+
+    def __setitem__(self, task_id, task):
+        values = [task_id] + row_values(task)[1:]
+        self._write(f"INSERT OR REPLACE INTO tasks ({', '.join(COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(COLUMNS))})", values)
+
+    def __delitem__(self, task_id):
+        cursor = self._write('DELETE FROM tasks WHERE id = ?', (task_id,))
+        if cursor.rowcount == 0:
+            raise KeyError(task_id)
+
+    def __iter__(self):
+        for row in self.conn.execute('SELECT id FROM tasks ORDER BY id'):
+            yield row[0]
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+
+    def values(self):
+        """Return every task in ID order"""
+        return [Task(*row) for row in
+                self.conn.execute('SELECT * FROM tasks ORDER BY id')]
+
+    def update_task(self, task_id, fields):
+        """Write changed fields of a task back to the database"""
+        columns = [column for column in fields if column in COLUMNS[1:]]
+        if not columns:
+            return
+        values = [_column_value(column, fields[column]) for column in columns]
+        assignments = ', '.join(f'{column} = ?' for column in columns)
+        self._write(f'UPDATE tasks SET {assignments} WHERE id = ?', values + [task_id])
+
+    def _write(self, sql, params):
+        """Run a write statement, committing unless a batch is open"""
+        cursor = self.conn.execute(sql, params)
+        if not self._batch_depth:
+            self.conn.commit()
+        return cursor
+
+    @contextmanager
+    def batch(self):
+        """Group writes into a single transaction"""
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.conn.rollback()
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth:
+            self.conn.commit()
+
+    def tasks_with_status(self, status):
+        """Return the tasks with a given status using the status index"""
+        return [Task(*row) for row in self.conn.execute(
+            'SELECT * FROM tasks WHERE status = ? ORDER BY id', (status,))]
+
+    def count_by(self, column):
+        """Return {value: count} for a column using a GROUP BY aggregate"""
+        if column not in ('status', 'priority'):
+            raise ValueError(f"Cannot count tasks by {column!r}")
+        return {row[0]: row[1] for row in self.conn.execute(
+            f'SELECT {column}, COUNT(*) FROM tasks GROUP BY {column}')}
+
+    def statistics(self):
+        """Return TaskStatistics counted by aggregates instead of reading every task"""
+        by_status = self.count_by('status')
+        # Timestamps have no time zone, so strftime('%s') counts the same
+        # seconds as parse_time()
+        seconds, count = self.conn.execute(
+            "SELECT SUM(CAST(strftime('%s', completed_at) AS INTEGER) - "
+            "CAST(strftime('%s', created_at) AS INTEGER)), COUNT(*) FROM tasks "
+            "WHERE status = 'Completed' AND completed_at IS NOT NULL").fetchone()
+        return TaskStatistics.from_dict({
+            'total': sum(by_status.values()),
+            'by_status': by_status,
+            'by_priority': self.count_by('priority'),
+            'completion_total': seconds or 0,
+            'completion_count': count
+        })
+
+    def next_id(self):
+        """Return the next ID; AUTOINCREMENT never hands out a used ID again"""
+        row = self.conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+        return (row[0] if row else 0) + 1
+
+    def reserve_ids(self, next_id):
+        """Make sure IDs below next_id are never handed out"""
+        with self.conn:
+            self.conn.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+            self.conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)",
+                (max(next_id, self.next_id()) - 1,))
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+def migrate_json(json_path, db_path):
+    """Copy every task from a JSON task file (and its journal) into SQLite"""
+    journal = TaskJournal(json_path)
+    tasks, next_id = journal.load()
+    journal.close()
+    store = SQLiteTaskStore(db_path)
+    with store.conn:
+        store.conn.executemany(
+            f"INSERT OR REPLACE INTO tasks ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(COLUMNS))})",
+            (row_values(task) for task in tasks.values()))
+    store.reserve_ids(next_id)
+    store.close()
+    return len(tasks)
+
+
+def main():
+    """Migrate a JSON task file into a SQLite database"""
+    parser = argparse.ArgumentParser(
+        description='Migrate tasks.json / tasks_gui.json into a SQLite database')
+    parser.add_argument('source', help='JSON task file to read')
+    parser.add_argument('target', help='SQLite database to create or update')
+    args = parser.parse_args()
+    count = migrate_json(args.source, args.target)
+    print(f"✓ Migrated {count} task(s) from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
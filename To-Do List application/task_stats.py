@@ -0,0 +1,130 @@
+"""
+Task Statistics for the To-Do List Application
+Counts are kept up to date as tasks change instead of being recomputed
+from the whole task list on every request
+"""
+
+from collections import Counter
+
+
+def completion_seconds(task):
+    """Return seconds from creation to completion, or None"""
+    if task.status != 'Completed' or task.completed_at is None:
+        return None
+    return task.completed_at - task.created_at
+
+
+def format_duration(seconds):
+    """Format a duration in seconds as e.g. '2d 3h' or '5m'"""
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+class TaskStatistics:
+    """Task counts maintained in O(1) per add, change and delete
+
+    Callers remove a task before changing it and add it back afterwards.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Recount from scratch, e.g. after loading"""
+        self.total = 0
+        self.by_status = Counter()
+        self.by_priority = Counter()
+        self.completion_total = 0.0
+        self.completion_count = 0
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        """Count a task"""
+        self._count(task, 1)
+
+    def remove(self, task):
+        """Stop counting a task"""
+        self._count(task, -1)
+
+    def _count(self, task, sign):
+        self.total += sign
+        self.by_status[task.status] += sign
+        self.by_priority[task.priority] += sign
+        seconds = completion_seconds(task)
+        if seconds is not None:
+            self.completion_total += sign * seconds
+            self.completion_count += sign
+
+    def to_dict(self):
+        """Return the counts as a JSON-ready dict"""
+        return {
+            'total': self.total,
+            'by_status': dict(self.by_status),
+            'by_priority': dict(self.by_priority),
+            'completion_total': self.completion_total,
+            'completion_count': self.completion_count
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build statistics from counts saved with to_dict()"""
+        stats = cls()
+        stats.total = data['total']
+        stats.by_status.update(data['by_status'])
+        stats.by_priority.update(data['by_priority'])
+        stats.completion_total = data['completion_total']
+        stats.completion_count = data['completion_count']
+        return stats
+
+    def __add__(self, other):
+        """Return the counts of both sets of tasks together"""
+        combined = TaskStatistics()
+        for stats in (self, other):
+            combined.total += stats.total
+            combined.by_status.update(stats.by_status)
+            combined.by_priority.update(stats.by_priority)
+            combined.completion_total += stats.completion_total
+            combined.completion_count += stats.completion_count
+        return combined
+
+    @property
+    def completed(self):
+        return self.by_status['Completed']
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+    @property
+    def completion_rate(self):
+        """Percentage of tasks completed"""
+        return (self.completed / self.total) * 100 if self.total else 0.0
+
+    @property
+    def mean_completion_seconds(self):
+        """Mean time from creation to completion, or None"""
+        if not self.completion_count:
+            return None
+        return self.completion_total / self.completion_count
+
+
+def statistics_dict(stats, archived=None):
+    """Return task statistics, counting archived tasks, as a JSON-ready dict"""
+    if archived is not None:
+        stats = stats + archived
+    return {
+        'total': stats.total,
+        'completed': stats.completed,
+        'pending': stats.pending,
+        'archived': archived.total if archived is not None else 0,
+        'by_priority': {p: stats.by_priority[p] for p in ('High', 'Medium', 'Low')},
+        'completion_rate': round(stats.completion_rate, 1),
+        'mean_completion_seconds': stats.mean_completion_seconds
+    }
@@ -0,0 +1,541 @@
+"""
+Task Store for the To-Do List Application
+The task model shared by the CLI, the GUI and the server: tasks keyed by ID
+with their indexes, storage, undo history, archive and statistics. It never
+prints or imports a GUI toolkit; the front-ends are views over it
+"""
+
+import threading
+from contextlib import contextmanager, nullcontext
+
+from task_archive import DEFAULT_ARCHIVE_DAYS, TaskArchive
+from task_dates import TimeIndex, in_range
+from task_file import dumps_task_file
+from task_journal import TaskJournal, apply_record, merge_records
+from task_model import DAY, Task, now
+from task_queue import TaskQueue
+from task_saver import BackgroundSaver
+from task_search import SearchIndex
+from task_sqlite import SQLiteTaskStore, is_sqlite_path
+from task_stats import TaskStatistics
+from task_sync import SharedTaskFile, StaleFileError
+from task_tags import TagIndex
+from task_undo import UNDO_SUFFIX, UndoHistory
+
+# Task file used by every front-end unless another is given
+DEFAULT_FILE = 'tasks.json'
+
+# Index attributes of a TaskStore, each built the first time it is used
+INDEXES = {
+    'stats': TaskStatistics,
+    'search_index': SearchIndex,
+    'queue': TaskQueue,
+    'timeline': TimeIndex,
+    'tag_index': TagIndex
+}
+
+
+class TaskStore:
+    """Tasks with their indexes, kept in step with the task file
+
+    A .db/.sqlite filename selects the SQLite store. JSON files are shared
+    with other processes: journaled if journal is set or the file already
+    has a journal, otherwise rewritten with a generation check. Rewrites
+    happen on the calling thread, or with background_save on a saver thread
+    once changes have gone quiet.
+
+    Every change goes through the store. Views registered with add_view()
+    are told about each one with task_changed(task_id, task), where task is
+    None once deleted, and with tasks_reloaded(merged) after the tasks were
+    replaced wholesale, merged being how many unsaved changes of ours were
+    replayed on top.
+    """
+
+    def __init__(self, filename=DEFAULT_FILE, journal=False, history=None,
+                 background_save=False):
+        self.filename = filename
+        self.db = SQLiteTaskStore(filename) if is_sqlite_path(filename) else None
+        self.journal = None
+        self.shared = None
+        if self.db is None:
+            self.journal = TaskJournal(filename)
+            # Keep journaling a file that already has one, or its records would be lost
+            if not (journal or self.journal.exists()):
+                self.journal = None
+                self.shared = SharedTaskFile(filename)
+        # Tasks keyed by their stable ID, in insertion order
+        self.tasks, self.next_id = self.load_tasks()
+        # Bumped on every change to the tasks, ours or another process's
+        self.version = 0
+        # Old completed tasks moved out of the task file
+        self.archive = TaskArchive(filename)
+        # Undo/redo steps, by default shared by every process using the file
+        self.history = history if history is not None else UndoHistory(filename + UNDO_SUFFIX)
+        # Indexes built so far, updated on every add, change and delete
+        self.indexes = []
+        self.views = []
+        # Held while the tasks change or are serialised by the saver thread
+        self.lock = threading.Lock()
+        # Records held back while a batch() is open
+        self._pending = None
+        self.saver = None
+        if background_save and self.shared is not None:
+            self.saver = BackgroundSaver(self._save_in_background)
+        # Records the saver has not written yet, replayed onto the file if
+        # another process saves first
+        self._unsaved = []
+        self._saving = 0
+
+    def __getattr__(self, name):
+        # Only called for missing attributes: build an index on first use,
+        # so commands that need none of them never read every task
+        index_type = INDEXES.get(name)
+        if index_type is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        index = index_type(list(self.tasks.values()))
+        setattr(self, name, index)
+        self.indexes.append(index)
+        return index
+
+    def add_view(self, view):
+        """Tell view about every change from now on"""
+        self.views.append(view)
+
+    # ---- Storage ----
+
+    def load_tasks(self):
+        """Load tasks from the task file and return (tasks, next ID)"""
+        if self.db is not None:
+            return self.db, self.db.next_id()
+        if self.journal:
+            return self.journal.load()
+        return self.shared.load()
+
+    def save_tasks(self):
+        """Rewrite the task file now"""
+        # The database and the journal are already up to date
+        if self.shared is not None:
+            self.shared.save_tasks(self.tasks, self.next_id)
+
+    def _save_in_background(self):
+        """Rewrite the task file (runs on the saver thread)"""
+        with self.shared.lock:
+            self.shared.save(self._dumps)
+            with self.lock:
+                del self._unsaved[:self._saving]
+
+    def _dumps(self, generation):
+        """Serialise the tasks, noting which unsaved records they include"""
+        with self.lock:
+            self._saving = len(self._unsaved)
+            return dumps_task_file(self.tasks, self.next_id, generation=generation)
+
+    def commit(self, record):
+        """Persist a single mutation, journaled or as a full rewrite"""
+        if self.db is not None:
+            # Inserts and deletes already went through the store mapping
+            if record['op'] == 'update':
+                self.db.update_task(record['id'], record['fields'])
+        elif self._pending is not None:
+            self._pending.append(record)
+        elif self.journal:
+            self.journal.append(record)
+        else:
+            self._persist([record])
+
+    def _persist(self, records):
+        if self.journal:
+            self.journal.append_many(records)
+        elif self.saver is not None:
+            with self.lock:
+                self._unsaved.extend(records)
+            self.saver.mark_dirty()
+        else:
+            self.save_tasks()
+
+    @contextmanager
+    def batch(self, label=None):
+        """Group mutations so they are persisted with a single commit
+
+        With a label they are also undone and redone as one step.
+        """
+        step = self.history.step(label) if label else nullcontext()
+        if self.db is not None:
+            with self.db.batch(), step:
+                yield
+            return
+        with self.locked():
+            outer = self._pending is None
+            if outer:
+                self._pending = []
+            try:
+                with step:
+                    yield
+            finally:
+                if outer:
+                    records, self._pending = self._pending, None
+                    if records:
+                        self._persist(records)
+
+    def flush(self):
+        """Write changes the saver thread still holds, before closing
+
+        Returns the error if they could not be written; they then stay
+        queued for another try.
+        """
+        if self.saver is None:
+            return None
+        self.saver.flush()
+        error = None
+        while not self.saver.errors.empty():
+            error = self.saver.errors.get()
+        if isinstance(error, StaleFileError):
+            # Another process saved first: merge with its copy and save again
+            error = None
+            with self.locked():
+                try:
+                    self._save_in_background()
+                except Exception as exc:
+                    error = exc
+        if error is not None:
+            self.saver = BackgroundSaver(self._save_in_background)
+            self.saver.mark_dirty()
+        return error
+
+    def close(self):
+        """Release the journal or database; call flush() first when saving in the background"""
+        if self.journal:
+            self.journal.close()
+        if self.db is not None:
+            self.db.close()
+
+    # ---- Other processes ----
+
+    def acquire(self, blocking=True):
+        """Take the task file lock, first catching up with other processes
+
+        Without blocking, return False instead of waiting if another process
+        holds it. Every successful acquire() needs a release().
+        """
+        if self.db is not None:
+            self.history.sync()
+            return True
+        lock = (self.journal or self.shared).lock
+        if not lock.acquire(blocking):
+            return False
+        if lock.depth == 1:
+            try:
+                self._catch_up()
+                self.history.sync()
+            except BaseException:
+                lock.release()
+                raise
+        return True
+
+    def release(self):
+        """Release the task file lock taken with acquire()"""
+        if self.db is None:
+            (self.journal or self.shared).lock.release()
+
+    @contextmanager
+    def locked(self):
+        """Hold the task file lock, first catching up with other processes"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def sync(self):
+        """Pick up the changes other processes saved to the task file"""
+        with self.locked():
+            pass
+
+    def poll(self):
+        """Like sync(), but skip this turn instead of waiting if the file is busy"""
+        if self.acquire(blocking=False):
+            self.release()
+
+    def _catch_up(self):
+        """Apply other processes' changes, incrementally where possible"""
+        if self.journal is None and TaskJournal(self.filename).exists():
+            # Another process started journaling the file; move our
+            # unsaved changes over to the journal
+            self.journal, self.shared = TaskJournal(self.filename), None
+            if self.saver is not None:
+                self.saver.flush()
+                self.saver = None
+            self._merge(self.journal.load(), self.journal.append_many)
+        elif self.journal:
+            records = self.journal.tail()
+            if records is None:
+                self._merge(self.journal.load())
+            else:
+                for record in records:
+                    self._apply_external(record)
+        elif self.shared.stale():
+            self._merge(self.shared.load(), lambda records: self.saver.mark_dirty())
+
+    def _merge(self, loaded, save=None):
+        """Adopt freshly loaded tasks with our unsaved records replayed on top"""
+        tasks, next_id = loaded
+        with self.lock:
+            unsaved, self._unsaved = self._unsaved, []
+        next_id, merged = merge_records(tasks, next_id, unsaved)
+        if any(old['op'] == 'add' and old['task']['id'] != new['task']['id']
+               for old, new in zip(unsaved, merged)):
+            # Our new tasks were given other IDs, which the undo steps do not know
+            self.history.clear()
+        with self.lock:
+            self.tasks = tasks
+            self.next_id = next_id
+            if self.saver is not None:
+                self._unsaved = merged
+        if merged and save is not None:
+            save(merged)
+        self.rebuild_indexes()
+        self.version += 1
+        for view in self.views:
+            view.tasks_reloaded(len(merged))
+
+    def _apply_external(self, record):
+        """Apply a record saved by another process, keeping the indexes in step"""
+        task_id = record['task']['id'] if record['op'] == 'add' else record['id']
+        old = self.tasks.get(task_id)
+        if old is not None:
+            for index in self.indexes:
+                index.remove(old)
+        with self.lock:
+            apply_record(self.tasks, record)
+        new = self.tasks.get(task_id)
+        if new is not None:
+            for index in self.indexes:
+                index.add(new)
+        if record['op'] == 'add':
+            self.next_id = max(self.next_id, task_id + 1)
+        self.version += 1
+        for view in self.views:
+            view.task_changed(task_id, new)
+
+    # ---- Changes ----
+
+    def rebuild_indexes(self):
+        """Rebuild every index built so far from the loaded tasks"""
+        if not self.indexes:
+            return
+        tasks = list(self.tasks.values())
+        for index in self.indexes:
+            index.rebuild(tasks)
+
+    def _insert(self, task):
+        """Store a new task and index it"""
+        with self.lock:
+            self.tasks[task.id] = task
+        for index in self.indexes:
+            index.add(task)
+        record = {'op': 'add', 'task': task.to_dict()}
+        self._committed(task.id, task, record, {'op': 'delete', 'id': task.id})
+
+    def _change(self, task, fields):
+        """Apply changed fields to a task, keeping the indexes in step"""
+        undo = {'op': 'update', 'id': task.id,
+                'fields': {name: getattr(task, name) for name in fields}}
+        for index in self.indexes:
+            index.remove(task)
+        with self.lock:
+            task.update(fields)
+        for index in self.indexes:
+            index.add(task)
+        record = {'op': 'update', 'id': task.id, 'fields': fields}
+        self._committed(task.id, task, record, undo)
+
+    def _remove(self, task):
+        """Delete a task and drop it from the indexes"""
+        with self.lock:
+            del self.tasks[task.id]
+        for index in self.indexes:
+            index.remove(task)
+        record = {'op': 'delete', 'id': task.id}
+        self._committed(task.id, None, record, {'op': 'add', 'task': task.to_dict()})
+
+    def _committed(self, task_id, task, record, undo):
+        """Persist and record a change made to the model, then tell the views"""
+        self.version += 1
+        self.commit(record)
+        self.history.record(record, undo)
+        for view in self.views:
+            view.task_changed(task_id, task)
+
+    def _remove_many(self, tasks):
+        """Delete many tasks with one commit and one index rebuild"""
+        with self.batch():
+            with self.lock:
+                for task in tasks:
+                    del self.tasks[task.id]
+            for task in tasks:
+                self.commit({'op': 'delete', 'id': task.id})
+        self.rebuild_indexes()
+        self.version += 1
+        for view in self.views:
+            view.tasks_reloaded(0)
+
+    def _apply_own(self, record):
+        """Make an undo or redo record as a change of our own"""
+        if record['op'] == 'add':
+            # IDs are never handed out twice, so a deleted task gets its ID back
+            if record['task']['id'] not in self.tasks:
+                self._insert(Task.from_dict(record['task']))
+            return
+        # Skip tasks another process has deleted or archived since
+        task = self.find_task(record['id'])
+        if task is None:
+            return
+        if record['op'] == 'update':
+            self._change(task, record['fields'])
+        else:
+            self._remove(task)
+
+    def create_task(self, title, description='', priority='Medium',
+                    status='Pending', created_at=None, completed_at=None, due_at=None,
+                    tags=()):
+        """Create and store a new task; return it"""
+        with self.locked():
+            task = Task(self.next_id, title, description, priority, status,
+                        created_at, completed_at, due_at, tags)
+            self.next_id += 1
+            self._insert(task)
+        return task
+
+    def import_tasks(self, rows):
+        """Add tasks from an iterable of dicts with a single commit; return how many"""
+        count = 0
+        with self.batch('Import tasks'):
+            for row in rows:
+                title = (row.get('title') or '').strip()
+                if not title:
+                    continue
+                self.create_task(title,
+                                 row.get('description') or '',
+                                 row.get('priority') or 'Medium',
+                                 row.get('status') or 'Pending',
+                                 row.get('created_at') or None,
+                                 row.get('completed_at') or None,
+                                 row.get('due_at') or None,
+                                 row.get('tags') or ())
+                count += 1
+        return count
+
+    def update_task(self, task_id, fields):
+        """Change fields of a task; return it, or None if there is no such task"""
+        with self.locked():
+            # Look the task up under the lock in case another process replaced it
+            task = self.find_task(task_id)
+            if task:
+                self._change(task, fields)
+        return task
+
+    def complete_task(self, task_id):
+        """Mark a task as completed; return it, or None"""
+        return self.update_task(task_id, {'status': 'Completed', 'completed_at': now()})
+
+    def remove_task(self, task_id):
+        """Delete a task; return it, or None"""
+        with self.locked():
+            task = self.find_task(task_id)
+            if task:
+                self._remove(task)
+        return task
+
+    def archive_tasks(self, days=DEFAULT_ARCHIVE_DAYS):
+        """Move tasks completed more than days ago into the archive; return how many"""
+        # Archived tasks are not restored by undo
+        with self.batch(), self.history.paused():
+            # Finish a run that stopped before deleting what it archived
+            leftovers = self.archive.leftovers(self.tasks)
+            archived = {task.id for task in leftovers}
+            old = [task for task in self.tasks_between('completed_at', None,
+                                                       now() - days * DAY, 'Completed')
+                   if task.id not in archived]
+            self.archive.add(old)
+            if leftovers or old:
+                self._remove_many(leftovers + old)
+        return len(old)
+
+    def undo(self):
+        """Undo the last change; return its step, or None if there is none"""
+        with self.batch():
+            return self.history.undo(self._apply_own)
+
+    def redo(self):
+        """Redo the last undone change; return its step, or None"""
+        with self.batch():
+            return self.history.redo(self._apply_own)
+
+    # ---- Queries ----
+
+    def find_task(self, task_id):
+        """Find a task by ID"""
+        return self.tasks.get(task_id)
+
+    def filter_tasks(self, status=None):
+        """Return all tasks, or only those with the given status"""
+        if not status:
+            return list(self.tasks.values())
+        if self.db is not None:
+            return self.db.tasks_with_status(status)
+        return [t for t in self.tasks.values() if t.status == status]
+
+    def search_tasks(self, query, status=None, archived=False):
+        """Return the tasks whose title or description match query"""
+        found = [self.find_task(task_id) for task_id in self.search_index.search(query)]
+        if status:
+            found = [t for t in found if t.status == status]
+        if archived:
+            found.extend(self.archive.search(query, status))
+        return found
+
+    def tasks_between(self, field, start=None, end=None, status=None):
+        """Return the tasks whose timestamp field lies in [start, end), earliest first"""
+        found = [self.find_task(task_id)
+                 for task_id in self.timeline.between(field, start, end)]
+        if status:
+            found = [t for t in found if t.status == status]
+        return found
+
+    def overdue_tasks(self):
+        """Return the pending tasks whose due date has passed, most overdue first"""
+        return self.tasks_between('due_at', None, now(), 'Pending')
+
+    def query_tasks(self, status=None, ranges=(), where=None):
+        """Return the tasks with a status and timestamps in every (field, start, end)
+
+        The first range is looked up in the time index, so the result is in
+        its field's time order; without ranges this is filter_tasks(). A
+        TagQuery in where is answered from the tag index.
+        """
+        if where is not None:
+            ids = where.evaluate(self.tag_index)
+            if not ranges:
+                found = [self.find_task(task_id) for task_id in sorted(ids)]
+                return [t for t in found if t.status == status] if status else found
+            return [t for t in self.query_tasks(status, ranges) if t.id in ids]
+        if not ranges:
+            return self.filter_tasks(status)
+        (field, start, end), rest = ranges[0], ranges[1:]
+        return [t for t in self.tasks_between(field, start, end, status)
+                if all(in_range(t, *other) for other in rest)]
+
+    def tag_counts(self):
+        """Return (tag, number of tasks) pairs, most used first"""
+        return self.tag_index.tag_counts()
+
+    def next_tasks(self, count):
+        """Return up to count pending tasks, highest priority and oldest first"""
+        return [self.find_task(task_id) for task_id in self.queue.top(count)]
+
+    def statistics(self):
+        """Return (statistics of the tasks here, statistics of the archived tasks)"""
+        if self.db is not None:
+            # Let the database count rather than reading every task
+            return self.db.statistics(), self.archive.stats()
+        return self.stats, self.archive.stats()
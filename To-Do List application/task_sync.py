@@ -0,0 +1,73 @@
+"""
+Shared Task Files for the To-Do List Application
+Lets several processes load and rewrite one task file: saves take an
+advisory lock and only go ahead if nobody else saved since this process
+last read the file
+"""
+
+from task_file import dumps_task_file, file_stamp, read_header, read_task_file, replace_file
+from task_journal import TaskJournal
+from task_lock import file_lock
+
+
+class StaleFileError(Exception):
+    """The task file was saved by another process since it was last read"""
+
+
+class SharedTaskFile:
+    """Optimistic concurrency for a task file that is rewritten whole
+
+    Every save increments the generation stored in the file. A save from a
+    process that loaded an older generation raises StaleFileError; the
+    process then reloads and replays its unsaved records with
+    task_journal.merge_records before saving again.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = file_lock(filename + '.lock')
+        self.generation = 0
+        self._stamp = None
+
+    def load(self):
+        """Read the file and return (tasks, next ID)"""
+        with self.lock:
+            self._stamp = file_stamp(self.filename)
+            tasks, next_id, header = read_task_file(self.filename)
+            self.generation = header.get('generation', 0)
+        return tasks, next_id
+
+    def stale(self):
+        """Return True if another process saved since the last load or save
+
+        Costs a stat() unless the file changed, then a read of its header.
+        A journal started by another process also makes this copy stale,
+        since rewriting the snapshot would then lose its records.
+        """
+        with self.lock:
+            if TaskJournal(self.filename).exists():
+                return True
+            stamp = file_stamp(self.filename)
+            if stamp == self._stamp:
+                return False
+            if read_header(self.filename).get('generation', 0) == self.generation:
+                self._stamp = stamp
+                return False
+            return True
+
+    def save(self, dumps):
+        """Write the text returned by dumps(generation) as the next generation
+
+        dumps is called with the lock held, so the text cannot go stale
+        before it is written.
+        """
+        with self.lock:
+            if self.stale():
+                raise StaleFileError(f"{self.filename} was changed by another process")
+            replace_file(self.filename, dumps(self.generation + 1))
+            self.generation += 1
+            self._stamp = file_stamp(self.filename)
+
+    def save_tasks(self, tasks, next_id):
+        """Save a task mapping as the next generation"""
+        self.save(lambda generation: dumps_task_file(tasks, next_id, generation=generation))
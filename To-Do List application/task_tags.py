@@ -0,0 +1,191 @@
+"""
+Tag Queries for the To-Do List Application
+An inverted index from tag, status and priority terms to task IDs, and
+boolean queries such as 'tag:backend AND NOT tag:blocked AND status:Pending'
+answered with set operations on it instead of a scan of every task
+"""
+
+import re
+
+from task_model import parse_tags
+
+# Fields a query term can name
+QUERY_FIELDS = ('tag', 'status', 'priority')
+QUERY_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+OPERATORS = ('AND', 'OR', 'NOT')
+
+
+def task_terms(task):
+    """Return the query terms a task matches, e.g. {'tag:backend', 'status:pending'}"""
+    terms = {f'tag:{tag}' for tag in task.tags}
+    terms.add(f'status:{task.status.casefold()}')
+    terms.add(f'priority:{task.priority.casefold()}')
+    return terms
+
+
+class TagIndex:
+    """Inverted index from query terms to the IDs of the tasks matching them"""
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Index all tasks from scratch, e.g. after loading"""
+        self.postings = {}
+        self.ids = set()
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        """Index one task"""
+        self.ids.add(task.id)
+        for term in task_terms(task):
+            ids = self.postings.get(term)
+            if ids is None:
+                ids = self.postings[term] = set()
+            ids.add(task.id)
+
+    def remove(self, task):
+        """Drop one task from the index (call before its fields change)"""
+        self.ids.discard(task.id)
+        for term in task_terms(task):
+            ids = self.postings.get(term)
+            if ids is not None:
+                ids.discard(task.id)
+                if not ids:
+                    del self.postings[term]
+
+    def lookup(self, term):
+        """Return the IDs of the tasks matching a term; do not modify the set"""
+        return self.postings.get(term, frozenset())
+
+    def tag_counts(self):
+        """Return (tag, number of tasks) pairs, most used first"""
+        counts = [(term[4:], len(ids)) for term, ids in self.postings.items()
+                  if term.startswith('tag:')]
+        return sorted(counts, key=lambda pair: (-pair[1], pair[0]))
+
+
+class TagQuery:
+    """A parsed boolean query over tag:, status: and priority: terms
+
+    AND binds tighter than OR, NOT tighter than both, parentheses group,
+    and terms written side by side are ANDed. Operators and values are
+    case-insensitive. Raises ValueError for a query that does not parse.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._tokens = QUERY_TOKEN.findall(text)
+        self._pos = 0
+        if not self._tokens:
+            raise ValueError("empty query")
+        self.tree = self._or()
+        if self._pos < len(self._tokens):
+            raise ValueError(f"unexpected {self._tokens[self._pos]!r}")
+        del self._tokens
+
+    # ---- Parsing ----
+
+    def _peek(self):
+        if self._pos < len(self._tokens):
+            token = self._tokens[self._pos]
+            return token.upper() if token.upper() in OPERATORS else token
+        return None
+
+    def _or(self):
+        items = [self._and()]
+        while self._peek() == 'OR':
+            self._pos += 1
+            items.append(self._and())
+        return items[0] if len(items) == 1 else ('or', items)
+
+    def _and(self):
+        items = [self._not()]
+        while self._peek() not in (None, 'OR', ')'):
+            if self._peek() == 'AND':
+                self._pos += 1
+            items.append(self._not())
+        return items[0] if len(items) == 1 else ('and', items)
+
+    def _not(self):
+        if self._peek() == 'NOT':
+            self._pos += 1
+            return ('not', self._not())
+        return self._atom()
+
+    def _atom(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError("query ends too soon")
+        self._pos += 1
+        if token == '(':
+            node = self._or()
+            if self._peek() != ')':
+                raise ValueError("missing ')'")
+            self._pos += 1
+            return node
+        if token in (')',) + OPERATORS:
+            raise ValueError(f"unexpected {token!r}")
+        field, _, value = token.partition(':')
+        field = field.casefold()
+        if field not in QUERY_FIELDS or not value:
+            raise ValueError(f"expected tag:, status: or priority: terms, got {token!r}")
+        if field == 'tag':
+            tags = parse_tags(value)
+            if len(tags) != 1:
+                raise ValueError(f"bad tag in {token!r}")
+            value = tags[0]
+        return ('term', f'{field}:{value.casefold()}')
+
+    # ---- Evaluation ----
+
+    def evaluate(self, index):
+        """Return the set of IDs of the indexed tasks matching the query"""
+        result = self._evaluate(self.tree, index)
+        # Never hand out a posting set the index still owns
+        return set(result) if self.tree[0] == 'term' else result
+
+    def _evaluate(self, node, index):
+        kind, value = node
+        if kind == 'term':
+            return index.lookup(value)
+        if kind == 'not':
+            return index.ids - self._evaluate(value, index)
+        if kind == 'or':
+            return set().union(*(self._evaluate(item, index) for item in value))
+        # AND: intersect the positive parts, smallest first, then subtract
+        # the negated ones instead of complementing them
+        positive = [self._evaluate(item, index) for item in value if item[0] != 'not']
+        negative = [self._evaluate(item[1], index) for item in value if item[0] == 'not']
+        if positive:
+            positive.sort(key=len)
+            result = set(positive[0])
+            for ids in positive[1:]:
+                if not result:
+                    break
+                result &= ids
+        else:
+            result = set(index.ids)
+        for ids in negative:
+            if not result:
+                break
+            result -= ids
+        return result
+
+    def matches(self, task):
+        """Return True if one task matches the query, without an index"""
+        return self._matches(self.tree, task_terms(task))
+
+    def _matches(self, node, terms):
+        kind, value = node
+        if kind == 'term':
+            return value in terms
+        if kind == 'not':
+            return not self._matches(value, terms)
+        if kind == 'or':
+            return any(self._matches(item, terms) for item in value)
+        return all(self._matches(item, terms) for item in value)
+
+    def __repr__(self):
+        return f"TagQuery({self.text!r})"
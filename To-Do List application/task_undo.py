@@ -0,0 +1,309 @@
+"""
+Undo and Redo for the To-Do List Application
+Each change is kept as the journal records it made together with their
+inverses, so undoing or redoing a step replays a few records instead of
+restoring a copy of the tasks. Old steps are squashed into checkpoints, and
+the oldest are dropped to stay within a memory budget
+"""
+
+import json
+import os
+from collections import deque
+from contextlib import contextmanager
+
+from task_file import file_stamp, replace_file
+
+UNDO_SUFFIX = '.undo'
+# Bytes of undo and redo steps kept, measured as JSON
+UNDO_BUDGET = 1024 * 1024
+# Above this many undo steps the oldest CHECKPOINT_STEPS become one checkpoint
+MAX_STEPS = 200
+CHECKPOINT_STEPS = 100
+# A history file is rewritten once its event log grows past this many budgets
+COMPACT_FACTOR = 4
+
+
+def record_id(record):
+    """Return the ID of the task a journal record changes"""
+    return record['task']['id'] if record['op'] == 'add' else record['id']
+
+
+def describe(record):
+    """Return a label for a step made of one record"""
+    task_id = record_id(record)
+    if record['op'] == 'add':
+        return f"Add task #{task_id}"
+    if record['op'] == 'delete':
+        return f"Delete task #{task_id}"
+    if record['fields'].get('status') == 'Completed':
+        return f"Complete task #{task_id}"
+    return f"Update task #{task_id}"
+
+
+def _combine(first, second):
+    """Return one record with the effect of first and then second on a task
+
+    None stands for no change, i.e. a task that was added and deleted again.
+    """
+    if first is None:
+        return second
+    if first['op'] == 'add':
+        if second['op'] == 'update':
+            return {'op': 'add', 'task': {**first['task'], **second['fields']}}
+        if second['op'] == 'delete':
+            return None
+    elif first['op'] == 'update':
+        if second['op'] == 'update':
+            return {'op': 'update', 'id': first['id'],
+                    'fields': {**first['fields'], **second['fields']}}
+        if second['op'] == 'delete':
+            return second
+    elif first['op'] == 'delete' and second['op'] == 'add':
+        fields = dict(second['task'])
+        del fields['id']
+        return {'op': 'update', 'id': first['id'], 'fields': fields}
+    return second
+
+
+def squash(records):
+    """Collapse records applied in order into at most one record per task
+
+    Records for different tasks are independent, so the result can be
+    applied in any order.
+    """
+    net = {}
+    for record in records:
+        task_id = record_id(record)
+        net[task_id] = _combine(net[task_id], record) if task_id in net else record
+    return [record for record in net.values() if record is not None]
+
+
+class UndoStep:
+    """One undoable change: its records and the records that reverse them
+
+    undo holds the inverse records in the order they are applied.
+    """
+
+    __slots__ = ('label', 'do', 'undo', 'size')
+
+    def __init__(self, label, do=None, undo=None):
+        self.label = label
+        self.do = do if do is not None else []
+        self.undo = undo if undo is not None else []
+        self.size = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        step = cls(data['label'], data['do'], data['undo'])
+        step.size = len(json.dumps(data))
+        return step
+
+    def to_dict(self):
+        return {'label': self.label, 'do': self.do, 'undo': self.undo}
+
+
+class UndoHistory:
+    """Undo and redo stacks of steps, optionally kept in a file
+
+    Front-ends call record() for every change they make, grouping the
+    records of one action with step(). With a path the history is an
+    append-only event log shared by every process using the task file, so
+    one CLI command can undo the change made by the previous one. The log
+    is only read once the steps are needed; new steps are appended to it
+    without reading it first.
+    """
+
+    def __init__(self, path=None, budget=UNDO_BUDGET):
+        self.path = path
+        self.budget = budget
+        self.undo_steps = deque()
+        self.redo_steps = []
+        self.size = 0
+        self._open = None
+        self._depth = 0
+        self._paused = 0
+        self._replaying = False
+        self._stamp = None
+        # False while the steps in the history file have not been read
+        self._loaded = path is None
+
+    def __len__(self):
+        self._load()
+        return len(self.undo_steps)
+
+    @contextmanager
+    def step(self, label):
+        """Group the records made inside into one step"""
+        self._depth += 1
+        if self._depth == 1:
+            self._open = UndoStep(label)
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                step, self._open = self._open, None
+                if step.do:
+                    step.undo.reverse()
+                    self.push(step)
+
+    @contextmanager
+    def paused(self):
+        """Ignore the records made inside, e.g. while undoing"""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def record(self, record, undo):
+        """Note a change and the record that reverses it"""
+        if self._paused:
+            return
+        if self._open is None:
+            with self.step(describe(record)):
+                self.record(record, undo)
+            return
+        self._open.do.append(record)
+        self._open.undo.append(undo)
+
+    def push(self, step):
+        """Add a finished step; new changes make the redo steps obsolete"""
+        if not self._loaded and not self._replaying:
+            # Replaying the file applies the budget once the steps are read
+            self._write({'push': step.to_dict()})
+            return
+        if not step.size:
+            step.size = len(json.dumps(step.to_dict()))
+        for old in self.redo_steps:
+            self.size -= old.size
+        self.redo_steps = []
+        if step.size > self.budget:
+            # Too big to keep: nothing before it can be undone either
+            self.clear()
+            return
+        self.undo_steps.append(step)
+        self.size += step.size
+        if len(self.undo_steps) > MAX_STEPS:
+            self._checkpoint()
+        while self.size > self.budget:
+            self.size -= self.undo_steps.popleft().size
+        self._write({'push': step.to_dict()})
+
+    def _checkpoint(self):
+        """Squash the oldest steps into one step that undoes them all at once"""
+        steps = [self.undo_steps.popleft() for _ in range(CHECKPOINT_STEPS)]
+        do = squash(record for step in steps for record in step.do)
+        undo = squash(record for step in reversed(steps) for record in step.undo)
+        checkpoint = UndoStep(f"{len(steps)} changes up to: {steps[-1].label}", do, undo)
+        checkpoint.size = len(json.dumps(checkpoint.to_dict()))
+        self.size += checkpoint.size - sum(step.size for step in steps)
+        self.undo_steps.appendleft(checkpoint)
+
+    def undo(self, apply):
+        """Undo the last step by passing its inverse records to apply
+
+        Returns the step, now redoable, or None if there is nothing to undo.
+        """
+        self._load()
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        with self.paused():
+            for record in step.undo:
+                apply(record)
+        self.redo_steps.append(step)
+        self._write({'undo': True})
+        return step
+
+    def redo(self, apply):
+        """Redo the last undone step by passing its records to apply"""
+        self._load()
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        with self.paused():
+            for record in step.do:
+                apply(record)
+        self.undo_steps.append(step)
+        self._write({'redo': True})
+        return step
+
+    def clear(self):
+        """Forget every step"""
+        self.undo_steps.clear()
+        self.redo_steps = []
+        self.size = 0
+        # Nothing written before the clear matters any more
+        self._loaded = True
+        self._write({'clear': True})
+
+    def _write(self, event):
+        """Append an event to the history file"""
+        if self.path is None or self._replaying:
+            return
+        # Callers hold the task file lock, so no one else appends meanwhile
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(event) + '\n')
+        self._stamp = file_stamp(self.path)
+        if self._stamp[2] > COMPACT_FACTOR * self.budget:
+            # Rewrite the log as the steps it leaves, reading it once per few budgets
+            self._load()
+            replace_file(self.path, json.dumps({'state': {
+                'undo': [step.to_dict() for step in self.undo_steps],
+                'redo': [step.to_dict() for step in self.redo_steps]}}) + '\n')
+            self._stamp = file_stamp(self.path)
+
+    def sync(self):
+        """Forget the steps read if another process has written to the history file
+
+        They are read again when next needed, so this costs one stat().
+        """
+        if self._loaded and self.path is not None and file_stamp(self.path) != self._stamp:
+            self._loaded = False
+
+    def _load(self):
+        """Read the steps from the history file unless they are current"""
+        if self._loaded:
+            return
+        self.undo_steps.clear()
+        self.redo_steps = []
+        self.size = 0
+        self._replaying = True
+        try:
+            for event in _read_events(self.path):
+                self._replay(event)
+        finally:
+            self._replaying = False
+        self._stamp = file_stamp(self.path)
+        self._loaded = True
+
+    def _replay(self, event):
+        if 'push' in event:
+            self.push(UndoStep.from_dict(event['push']))
+        elif 'undo' in event and self.undo_steps:
+            step = self.undo_steps.pop()
+            self.redo_steps.append(step)
+        elif 'redo' in event and self.redo_steps:
+            self.undo_steps.append(self.redo_steps.pop())
+        elif 'clear' in event:
+            self.clear()
+        elif 'state' in event:
+            self.undo_steps = deque(UndoStep.from_dict(step) for step in event['state']['undo'])
+            self.redo_steps = [UndoStep.from_dict(step) for step in event['state']['redo']]
+            self.size = sum(step.size for step in self.undo_steps) + sum(
+                step.size for step in self.redo_steps)
+
+
+def _read_events(path):
+    """Yield the intact events of a history file"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as file:
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break
@@ -3,131 +3,216 @@ Command-Line To-Do List Application
 A simple and efficient CLI-based task management system
 """
 
+import argparse
+import csv
 import json
-import os
-from datetime import datetime
+from itertools import chain
+from operator import attrgetter
+
+from task_archive import DEFAULT_ARCHIVE_DAYS, TaskArchive
+from task_dates import in_range, parse_range
+from task_file import TaskFileError
+from task_journal import TaskJournal
+from task_model import format_due, format_time, now, parse_due, parse_tags
+from task_search import task_words, tokenize, words_match
+from task_sqlite import is_sqlite_path
+from task_stats import TaskStatistics, format_duration, statistics_dict
+from task_store import DEFAULT_FILE, TaskStore
+from task_tags import TagQuery
+
+# Commands that only read tasks and can stream them from a JSON file
+STREAMED_COMMANDS = ('list', 'search', 'stats')
 
 class TodoListCLI:
-    def __init__(self, filename='tasks.json'):
+    def __init__(self, filename=DEFAULT_FILE, journal=False):
         self.filename = filename
-        self.tasks = self.load_tasks()
+        # The tasks, their indexes and storage; this class prints the results
+        self.store = TaskStore(filename, journal=journal)
     
-    def load_tasks(self):
-        """Load tasks from JSON file"""
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r') as file:
-                    return json.load(file)
-            except json.JSONDecodeError:
-                return []
-        return []
-    
-    def save_tasks(self):
-        """Save tasks to JSON file"""
-        with open(self.filename, 'w') as file:
-            json.dump(self.tasks, file, indent=4)
-    
-    def add_task(self, title, description='', priority='Medium'):
+    def sync(self):
+        """Pick up the changes other processes saved to the task file"""
+        self.store.sync()
+    
+    def close(self):
+        """Flush pending storage work before exiting"""
+        self.store.close()
+    
+    def add_task(self, title, description='', priority='Medium', due_at=None, tags=()):
         """Add a new task"""
-        task = {
-            'id': len(self.tasks) + 1,
-            'title': title,
-            'description': description,
-            'priority': priority,
-            'status': 'Pending',
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'completed_at': None
-        }
-        self.tasks.append(task)
-        self.save_tasks()
+        self.store.create_task(title, description, priority, due_at=due_at, tags=tags)
         print(f"✓ Task '{title}' added successfully!")
     
-    def view_tasks(self, filter_status=None):
-        """View all tasks or filtered by status"""
-        if not self.tasks:
+    def view_tasks(self, filter_status=None, ranges=(), where=None):
+        """View all tasks or filtered by status, date ranges and a tag query"""
+        if not self.store.tasks:
             print("\nNo tasks found!")
             return
         
-        filtered_tasks = self.tasks
-        if filter_status:
-            filtered_tasks = [t for t in self.tasks if t['status'] == filter_status]
+        filtered_tasks = self.store.query_tasks(filter_status, ranges, where)
         
         if not filtered_tasks:
-            print(f"\nNo {filter_status} tasks found!")
+            if where is not None:
+                print(f"\nNo tasks match '{where.text}'!")
+            elif ranges:
+                print("\nNo tasks found in that date range!")
+            else:
+                print(f"\nNo {filter_status} tasks found!")
             return
         
-        print("\n" + "="*80)
-        print(f"{'ID':<5} {'Title':<25} {'Priority':<10} {'Status':<12} {'Created':<20}")
-        print("="*80)
-        
-        for task in filtered_tasks:
-            print(f"{task['id']:<5} {task['title']:<25} {task['priority']:<10} "
-                  f"{task['status']:<12} {task['created_at']:<20}")
-            if task['description']:
-                print(f"      Description: {task['description']}")
-        print("="*80)
-    
-    def update_task(self, task_id, title=None, description=None, priority=None):
+        self.print_table(filtered_tasks)
+    
+    def search(self, query, filter_status=None, archived=False):
+        """View the tasks matching a keyword search"""
+        found = self.store.search_tasks(query, filter_status, archived)
+        if not found:
+            print(f"\nNo tasks matching '{query}' found!")
+            return
+        self.print_table(found)
+    
+    def view_next(self, count=5):
+        """View the pending tasks to do next, by priority and age"""
+        upcoming = self.store.next_tasks(count)
+        if not upcoming:
+            print("\nNo pending tasks!")
+            return
+        self.print_table(upcoming)
+    
+    def print_table(self, tasks):
+        """Print tasks as a table"""
+        print_task_table(tasks)
+    
+    def update_task(self, task_id, title=None, description=None, priority=None,
+                    due_at=None, tags=None):
         """Update an existing task"""
-        task = self.find_task(task_id)
-        if task:
-            if title:
-                task['title'] = title
-            if description:
-                task['description'] = description
-            if priority:
-                task['priority'] = priority
-            self.save_tasks()
+        fields = {}
+        if title:
+            fields['title'] = title
+        if description:
+            fields['description'] = description
+        if priority:
+            fields['priority'] = priority
+        if due_at is not None:
+            fields['due_at'] = due_at
+        if tags is not None:
+            fields['tags'] = tags
+        if self.store.update_task(task_id, fields):
             print(f"✓ Task #{task_id} updated successfully!")
         else:
             print(f"✗ Task #{task_id} not found!")
     
     def mark_complete(self, task_id):
         """Mark a task as completed"""
-        task = self.find_task(task_id)
-        if task:
-            task['status'] = 'Completed'
-            task['completed_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.save_tasks()
+        if self.store.complete_task(task_id):
             print(f"✓ Task #{task_id} marked as completed!")
         else:
             print(f"✗ Task #{task_id} not found!")
     
+    def set_due(self, task_id, due_at):
+        """Set a task's due date, or clear it with None"""
+        if not self.store.update_task(task_id, {'due_at': due_at}):
+            print(f"✗ Task #{task_id} not found!")
+        elif due_at is None:
+            print(f"✓ Task #{task_id} no longer has a due date!")
+        else:
+            print(f"✓ Task #{task_id} is due {format_due(due_at)}!")
+    
+    def tag_task(self, task_id, add=(), remove=()):
+        """Add tags to and remove tags from a task"""
+        task = self.store.find_task(task_id)
+        if task is None:
+            print(f"✗ Task #{task_id} not found!")
+            return
+        tags = (set(task.tags) | set(parse_tags(add))) - set(parse_tags(remove))
+        # Another process may have deleted the task since it was looked up
+        task = self.store.update_task(task_id, {'tags': sorted(tags)})
+        if task is None:
+            print(f"✗ Task #{task_id} not found!")
+            return
+        print(f"✓ Task #{task_id} tags: {format_tags(task.tags) or '(none)'}")
+    
+    def view_tags(self):
+        """View every tag with the number of tasks carrying it"""
+        counts = self.store.tag_counts()
+        if not counts:
+            print("\nNo tagged tasks!")
+            return
+        for tag, count in counts:
+            print(f"#{tag:<24} {count}")
+    
+    def archive_tasks(self, days=DEFAULT_ARCHIVE_DAYS):
+        """Move tasks completed more than days ago into the archive"""
+        count = self.store.archive_tasks(days)
+        print(f"✓ Archived {count} task(s) completed more than {days} day(s) ago")
+    
+    def undo(self, count=1):
+        """Undo the last count changes"""
+        for _ in range(count):
+            step = self.store.undo()
+            if step is None:
+                print("✗ Nothing to undo!")
+                return
+            print(f"✓ Undone: {step.label}")
+    
+    def redo(self, count=1):
+        """Redo the last count undone changes"""
+        for _ in range(count):
+            step = self.store.redo()
+            if step is None:
+                print("✗ Nothing to redo!")
+                return
+            print(f"✓ Redone: {step.label}")
+    
     def delete_task(self, task_id):
         """Delete a task"""
-        task = self.find_task(task_id)
-        if task:
-            self.tasks.remove(task)
-            # Reassign IDs
-            for i, t in enumerate(self.tasks, 1):
-                t['id'] = i
-            self.save_tasks()
+        if self.store.remove_task(task_id):
             print(f"✓ Task #{task_id} deleted successfully!")
         else:
             print(f"✗ Task #{task_id} not found!")
     
-    def find_task(self, task_id):
-        """Find a task by ID"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                return task
-        return None
-    
     def get_statistics(self):
         """Display task statistics"""
-        total = len(self.tasks)
-        completed = len([t for t in self.tasks if t['status'] == 'Completed'])
-        pending = total - completed
-        
-        print("\n" + "="*50)
-        print("TASK STATISTICS")
-        print("="*50)
-        print(f"Total Tasks: {total}")
-        print(f"Completed: {completed}")
-        print(f"Pending: {pending}")
-        if total > 0:
-            print(f"Completion Rate: {(completed/total)*100:.1f}%")
-        print("="*50)
+        print_statistics(*self.store.statistics())
+
+def print_task_table(tasks):
+    """Print an iterable of tasks as a table"""
+    print("\n" + "="*80)
+    print(f"{'ID':<5} {'Title':<25} {'Priority':<10} {'Status':<12} {'Created':<20}")
+    print("="*80)
+    
+    for task in tasks:
+        print(f"{task.id:<5} {task.title:<25} {task.priority:<10} "
+              f"{task.status:<12} {format_time(task.created_at):<20}")
+        if task.description:
+            print(f"      Description: {task.description}")
+        if task.due_at is not None:
+            print(f"      Due: {format_due(task.due_at)}")
+        if task.tags:
+            print(f"      Tags: {format_tags(task.tags)}")
+    print("="*80)
+
+def format_tags(tags):
+    """Format tags for display, e.g. '#backend #urgent'"""
+    return ' '.join(f'#{tag}' for tag in tags)
+
+def print_statistics(stats, archived=None):
+    """Display task statistics, counting archived tasks in the totals"""
+    if archived is not None:
+        stats = stats + archived
+    print("\n" + "="*50)
+    print("TASK STATISTICS")
+    print("="*50)
+    print(f"Total Tasks: {stats.total}")
+    print(f"Completed: {stats.completed}")
+    print(f"Pending: {stats.pending}")
+    if archived is not None and archived.total:
+        print(f"Archived: {archived.total}")
+    if stats.total > 0:
+        print(f"Completion Rate: {stats.completion_rate:.1f}%")
+        print(f"Priority: High {stats.by_priority['High']}, "
+              f"Medium {stats.by_priority['Medium']}, Low {stats.by_priority['Low']}")
+    if stats.mean_completion_seconds is not None:
+        print(f"Avg. Time to Complete: {format_duration(stats.mean_completion_seconds)}")
+    print("="*50)
 
 def display_menu():
     """Display the main menu"""
@@ -143,21 +228,27 @@ def display_menu():
     print("7. Delete Task")
     print("8. View Statistics")
     print("9. Exit")
+    print("U. Undo Last Change     R. Redo")
     print("="*50)
 
-def main():
-    """Main function to run the CLI application"""
-    todo = TodoListCLI()
-    
+def run_menu(todo):
+    """Run the interactive menu loop"""
     while True:
+        todo.sync()
         display_menu()
-        choice = input("\nEnter your choice (1-9): ").strip()
+        choice = input("\nEnter your choice (1-9, U, R): ").strip().upper()
         
         if choice == '1':
             title = input("Enter task title: ").strip()
             description = input("Enter task description (optional): ").strip()
             priority = input("Enter priority (Low/Medium/High) [Medium]: ").strip() or 'Medium'
-            todo.add_task(title, description, priority)
+            tags = input("Enter tags (comma-separated, optional): ").strip()
+            try:
+                due = input("Enter due date (YYYY-MM-DD, optional): ").strip()
+                todo.add_task(title, description, priority, parse_due(due) if due else None,
+                              parse_tags(tags))
+            except ValueError:
+                print("✗ Invalid due date! Use YYYY-MM-DD")
         
         elif choice == '2':
             todo.view_tasks()
@@ -175,9 +266,18 @@ def main():
                 title = input("Enter new title: ").strip() or None
                 description = input("Enter new description: ").strip() or None
                 priority = input("Enter new priority: ").strip() or None
-                todo.update_task(task_id, title, description, priority)
+                due = input("Enter new due date (YYYY-MM-DD): ").strip()
+                tags = input("Enter new tags (comma-separated): ").strip()
             except ValueError:
                 print("✗ Invalid task ID!")
+            else:
+                try:
+                    due_at = parse_due(due) if due else None
+                except ValueError:
+                    print("✗ Invalid due date! Use YYYY-MM-DD")
+                else:
+                    todo.update_task(task_id, title, description, priority, due_at,
+                                     parse_tags(tags) if tags else None)
         
         elif choice == '6':
             try:
@@ -198,12 +298,293 @@ def main():
         elif choice == '8':
             todo.get_statistics()
         
+        elif choice == 'U':
+            todo.undo()
+        
+        elif choice == 'R':
+            todo.redo()
+        
         elif choice == '9':
             print("\nThank you for using To-Do List Application!")
             break
         
         else:
-            print("✗ Invalid choice! Please enter a number between 1 and 9.")
+            print("✗ Invalid choice! Please enter a number between 1 and 9, U or R.")
+
+def read_rows(path):
+    """Stream task rows from a .csv or .jsonl file"""
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.lower().endswith('.csv'):
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+def print_statistics_json(stats, archived=None):
+    """Print task statistics as one JSON object"""
+    print(json.dumps(statistics_dict(stats, archived)))
+
+def date_ranges(args):
+    """Return the (field, start, end) ranges selected by list's date options"""
+    ranges = []
+    if getattr(args, 'overdue', False):
+        ranges.append(('due_at', None, now()))
+    for field, option in (('due_at', 'due'), ('created_at', 'created'),
+                          ('completed_at', 'completed')):
+        bounds = getattr(args, option, None)
+        if bounds:
+            ranges.append((field,) + bounds)
+    return ranges
+
+def stream_tasks(args):
+    """Stream the tasks a read-only command needs from a JSON task file"""
+    # Statistics never look at titles or descriptions
+    skip = ('title', 'description') if args.command == 'stats' else ()
+    tasks = TaskJournal(args.file).iter_tasks(skip)
+    if getattr(args, 'status', None):
+        tasks = (task for task in tasks if task.status == args.status)
+    if args.command == 'search':
+        words = tokenize(args.query)
+        if not words:
+            return iter(())
+        tasks = (task for task in tasks if words_match(task_words(task), words))
+        if args.archived:
+            tasks = chain(tasks, TaskArchive(args.file).search(args.query, args.status))
+    where = getattr(args, 'where', None)
+    if where is not None:
+        tasks = (task for task in tasks if where.matches(task))
+    ranges = date_ranges(args)
+    if ranges:
+        tasks = (task for task in tasks if all(in_range(task, *r) for r in ranges))
+        # Same order as the time index; only the matching tasks are held
+        tasks = iter(sorted(tasks, key=attrgetter(ranges[0][0], 'id')))
+    return tasks
+
+def run_streamed(args):
+    """Run list, search or stats without loading the whole task file"""
+    try:
+        tasks = stream_tasks(args)
+        if args.command == 'stats':
+            stats = TaskStatistics(tasks)
+            archived = TaskArchive(args.file).stats()
+            if args.json:
+                print_statistics_json(stats, archived)
+            else:
+                print_statistics(stats, archived)
+        elif args.table:
+            first = next(tasks, None)
+            if first is None:
+                if args.command == 'search':
+                    print(f"\nNo tasks matching '{args.query}' found!")
+                elif getattr(args, 'where', None) is not None:
+                    print(f"\nNo tasks match '{args.where.text}'!")
+                elif date_ranges(args):
+                    print("\nNo tasks found in that date range!")
+                elif args.status:
+                    print(f"\nNo {args.status} tasks found!")
+                else:
+                    print("\nNo tasks found!")
+            else:
+                print_task_table(chain([first], tasks))
+        else:
+            for task in tasks:
+                print(json.dumps(task.to_dict(), ensure_ascii=False))
+    except ValueError as error:
+        print(f"✗ Could not read {args.file}: {error}")
+
+def date_range(text):
+    """argparse type for a date range option"""
+    try:
+        return parse_range(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected a date (YYYY-MM-DD), FROM..TO or a range name, got {text!r}")
+
+def tag_query(text):
+    """argparse type for a boolean tag query"""
+    try:
+        return TagQuery(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"bad query {text!r}: {error}")
+
+def due_date(text):
+    """argparse type for a due date"""
+    try:
+        return parse_due(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date (YYYY-MM-DD), got {text!r}")
+
+def build_parser():
+    """Build the argument parser for non-interactive use"""
+    parser = argparse.ArgumentParser(
+        description="To-Do List Application. Run without a command for the interactive menu.")
+    parser.add_argument('--file', default=DEFAULT_FILE,
+                        help="task file (.json, or .db for SQLite) [tasks.json]")
+    parser.add_argument('--journal', action='store_true',
+                        help="append changes to a journal instead of rewriting the file")
+    commands = parser.add_subparsers(dest='command')
+
+    add = commands.add_parser('add', help="add a task")
+    add.add_argument('title')
+    add.add_argument('-d', '--description', default='')
+    add.add_argument('-p', '--priority', default='Medium', choices=['Low', 'Medium', 'High'])
+    add.add_argument('--due', type=due_date, metavar='DATE', help="due date, YYYY-MM-DD")
+    add.add_argument('-t', '--tag', action='append', default=[], metavar='TAG',
+                     help="tag the task (repeat or separate with commas)")
+
+    list_cmd = commands.add_parser(
+        'list', help="list tasks as JSON lines",
+        epilog="RANGE is a date (YYYY-MM-DD), FROM..TO with either end optional, "
+               "or one of today, tomorrow, this-week, next-week, last-week, "
+               "this-month, last-month. Date filters list tasks in time order. "
+               "QUERY combines tag:NAME, status:STATUS and priority:LEVEL terms "
+               "with AND, OR, NOT and parentheses, e.g. "
+               "'tag:backend AND NOT tag:blocked AND status:Pending'.")
+    list_cmd.add_argument('--status', choices=['Pending', 'Completed'])
+    list_cmd.add_argument('--overdue', action='store_true',
+                          help="only pending tasks whose due date has passed")
+    list_cmd.add_argument('--due', type=date_range, metavar='RANGE', help="due in RANGE")
+    list_cmd.add_argument('--created', type=date_range, metavar='RANGE',
+                          help="created in RANGE")
+    list_cmd.add_argument('--completed', type=date_range, metavar='RANGE',
+                          help="completed in RANGE")
+    list_cmd.add_argument('--where', type=tag_query, metavar='QUERY',
+                          help="only tasks matching a tag query")
+    list_cmd.add_argument('--table', action='store_true', help="print the boxed table instead")
+
+    due = commands.add_parser('due', help="set a task's due date, or clear it without DATE")
+    due.add_argument('id', type=int, metavar='ID')
+    due.add_argument('date', type=due_date, nargs='?', metavar='DATE')
+
+    tag = commands.add_parser('tag', help="add tags to a task")
+    tag.add_argument('id', type=int, metavar='ID')
+    tag.add_argument('tags', nargs='+', metavar='TAG')
+
+    untag = commands.add_parser('untag', help="remove tags from a task")
+    untag.add_argument('id', type=int, metavar='ID')
+    untag.add_argument('tags', nargs='+', metavar='TAG')
+
+    commands.add_parser('tags', help="list tags with their task counts")
+
+    done = commands.add_parser('done', help="mark tasks as completed")
+    done.add_argument('ids', type=int, nargs='+', metavar='ID')
+
+    rm = commands.add_parser('rm', help="delete tasks")
+    rm.add_argument('ids', type=int, nargs='+', metavar='ID')
+
+    search = commands.add_parser('search', help="find tasks by keyword (prefixes match)")
+    search.add_argument('query')
+    search.add_argument('--status', choices=['Pending', 'Completed'])
+    search.add_argument('--archived', action='store_true', help="also search archived tasks")
+    search.add_argument('--table', action='store_true', help="print the boxed table instead")
+
+    next_cmd = commands.add_parser('next', help="list the pending tasks to do next")
+    next_cmd.add_argument('count', type=int, nargs='?', default=5, metavar='N')
+    next_cmd.add_argument('--table', action='store_true', help="print the boxed table instead")
+
+    stats = commands.add_parser('stats', help="show statistics")
+    stats.add_argument('--json', action='store_true', help="print a JSON object")
+
+    archive = commands.add_parser('archive', help="move old completed tasks to the archive")
+    archive.add_argument('--days', type=int, default=DEFAULT_ARCHIVE_DAYS,
+                         help=f"archive tasks completed more than DAYS ago [{DEFAULT_ARCHIVE_DAYS}]")
+
+    undo = commands.add_parser('undo', help="undo the last change(s)")
+    undo.add_argument('count', type=int, nargs='?', default=1, metavar='N')
+
+    redo = commands.add_parser('redo', help="redo the last undone change(s)")
+    redo.add_argument('count', type=int, nargs='?', default=1, metavar='N')
+
+    serve = commands.add_parser('serve', help="serve the tasks over a local HTTP/JSON API")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+
+    import_cmd = commands.add_parser('import', help="bulk import tasks from .csv or .jsonl")
+    import_cmd.add_argument('path', metavar='FILE')
+    return parser
+
+def main(argv=None):
+    """Main function to run the CLI application"""
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'overdue', False):
+        args.status = args.status or 'Pending'
+    if args.command in STREAMED_COMMANDS and not is_sqlite_path(args.file):
+        # Read-only commands stream JSON files in bounded memory
+        run_streamed(args)
+        return
+    if args.command == 'serve':
+        # Imported here so the other commands do not load asyncio
+        from todo_server import run_server
+        run_server(args.file, args.host, args.port, args.journal)
+        return
+    try:
+        todo = TodoListCLI(args.file, journal=args.journal)
+    except TaskFileError as error:
+        print(f"✗ Could not read {args.file}: {error}. The file was left as it is.")
+        return
+    try:
+        if args.command is None:
+            run_menu(todo)
+        elif args.command == 'add':
+            todo.add_task(args.title, args.description, args.priority, args.due,
+                          parse_tags(args.tag))
+        elif args.command == 'list':
+            if args.table:
+                todo.view_tasks(args.status, date_ranges(args), args.where)
+            else:
+                for task in todo.store.query_tasks(args.status, date_ranges(args), args.where):
+                    print(json.dumps(task.to_dict(), ensure_ascii=False))
+        elif args.command == 'search':
+            if args.table:
+                todo.search(args.query, args.status, args.archived)
+            else:
+                for task in todo.store.search_tasks(args.query, args.status, args.archived):
+                    print(json.dumps(task.to_dict(), ensure_ascii=False))
+        elif args.command == 'next':
+            if args.table:
+                todo.view_next(args.count)
+            else:
+                for task in todo.store.next_tasks(args.count):
+                    print(json.dumps(task.to_dict(), ensure_ascii=False))
+        elif args.command == 'due':
+            todo.set_due(args.id, args.date)
+        elif args.command == 'tag':
+            todo.tag_task(args.id, add=args.tags)
+        elif args.command == 'untag':
+            todo.tag_task(args.id, remove=args.tags)
+        elif args.command == 'tags':
+            todo.view_tags()
+        elif args.command == 'undo':
+            todo.undo(args.count)
+        elif args.command == 'redo':
+            todo.redo(args.count)
+        elif args.command == 'done':
+            with todo.store.batch(f"Complete tasks {', '.join(map(str, args.ids))}"):
+                for task_id in args.ids:
+                    todo.mark_complete(task_id)
+        elif args.command == 'rm':
+            with todo.store.batch(f"Delete tasks {', '.join(map(str, args.ids))}"):
+                for task_id in args.ids:
+                    todo.delete_task(task_id)
+        elif args.command == 'stats':
+            if args.json:
+                print_statistics_json(*todo.store.statistics())
+            else:
+                todo.get_statistics()
+        elif args.command == 'archive':
+            todo.archive_tasks(args.days)
+        elif args.command == 'import':
+            try:
+                count = todo.store.import_tasks(read_rows(args.path))
+            except (KeyError, ValueError) as error:
+                # A database rolls the whole import back; the other backends keep earlier rows
+                kept = 'nothing was imported' if todo.store.db is not None else 'earlier rows were kept'
+                print(f"✗ Import stopped at a bad row ({error}); {kept}")
+            else:
+                print(f"✓ Imported {count} task(s) from {args.path}")
+    finally:
+        todo.close()
 
 if __name__ == "__main__":
     main()
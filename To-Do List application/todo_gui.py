@@ -5,26 +5,107 @@ A user-friendly graphical interface for task management
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import json
 import os
-from datetime import datetime
+import sys
+from bisect import bisect_left
+
+from task_archive import DEFAULT_ARCHIVE_DAYS
+from task_dates import in_range, named_range
+from task_file import TaskFileError
+from task_journal import TaskJournal
+from task_model import format_due, format_time, parse_due, parse_tags
+from task_stats import format_duration
+from task_store import DEFAULT_FILE, TaskStore
+from task_tags import TagQuery
+from task_sync import StaleFileError
+from task_undo import UndoHistory
+from virtual_tree import VirtualTreeview
+
+# Above this many tasks the list only materialises the rows in view
+VIRTUAL_THRESHOLD = 10000
+# Rows in the Next Up panel
+NEXT_UP_COUNT = 5
+# How often to look for changes saved by other processes
+FILE_POLL_MS = 1000
+# Task file the GUI used before it shared DEFAULT_FILE with the CLI
+OLD_GUI_FILE = 'tasks_gui.json'
+# Date filters: label -> (time field, named range, required status)
+DATE_FILTERS = {
+    'Any Time': None,
+    'Overdue': ('due_at', 'overdue', 'Pending'),
+    'Due Today': ('due_at', 'today', None),
+    'Due This Week': ('due_at', 'this-week', None),
+    'Due Next Week': ('due_at', 'next-week', None),
+    'Created This Week': ('created_at', 'this-week', None),
+    'Completed Today': ('completed_at', 'today', None),
+    'Completed This Week': ('completed_at', 'this-week', None),
+    'Completed Last Week': ('completed_at', 'last-week', None),
+}
+
+def adopt_old_gui_file(filename):
+    """Rename the GUI's old task file to filename if that has no tasks yet
+
+    Returns a message for the user, or None if there was nothing to do.
+    """
+    if filename != DEFAULT_FILE or not os.path.exists(OLD_GUI_FILE):
+        return None
+    if os.path.exists(filename) or TaskJournal(filename).exists():
+        return (f"Tasks saved by earlier versions of this window are still in "
+                f"{OLD_GUI_FILE}; open it with: python todo_gui.py {OLD_GUI_FILE}")
+    # Its journal, archive and undo files move along with it
+    folder = os.path.dirname(os.path.abspath(OLD_GUI_FILE))
+    for name in os.listdir(folder):
+        if name.startswith(OLD_GUI_FILE + '.') and not name.endswith('.lock'):
+            os.rename(os.path.join(folder, name),
+                      os.path.join(folder, filename + name[len(OLD_GUI_FILE):]))
+    os.rename(OLD_GUI_FILE, filename)
+    return f"Moved your tasks from {OLD_GUI_FILE} to {filename}"
 
 class TodoListGUI:
-    def __init__(self, root):
+    def __init__(self, root, filename=DEFAULT_FILE, virtual=None):
         self.root = root
         self.root.title("To-Do List Application")
         self.root.geometry("900x650")
         self.root.resizable(True, True)
         
-        self.filename = 'tasks_gui.json'
-        self.tasks = self.load_tasks()
+        self.filename = filename
+        # Earlier versions kept the GUI's tasks apart from the CLI's
+        try:
+            moved = adopt_old_gui_file(filename)
+        except OSError as error:
+            moved = f"Could not move {OLD_GUI_FILE} to {filename}: {error}"
+        # The tasks, their indexes and storage; the window is a view of them.
+        # Rewrites are saved in the background and undo is per window.
+        self.store = TaskStore(filename, history=UndoHistory(), background_save=True)
+        self.store.add_view(self)
+        # Values of the rows inserted in the Treeview, keyed by task ID, and
+        # the sorted IDs of the rows currently attached (passing the filter)
+        self._rows = {}
+        self._visible = []
+        # (field, start, end, status) of the date filter, fixed when it is applied
+        self._date_filter = None
+        # Parsed tag query of the filter, or None, and why the typed one was not used
+        self._tag_query = None
+        self._tag_query_error = None
+        if virtual is None:
+            virtual = len(self.store.tasks) > VIRTUAL_THRESHOLD
+        self.view = None
         
         # Configure style
         self.setup_styles()
         
         # Create GUI components
-        self.create_widgets()
+        self.create_widgets(virtual)
         self.refresh_task_list()
+        self.update_next_up()
+        if moved:
+            messagebox.showinfo("Task File", moved)
+        
+        self.root.bind('<Control-z>', self.undo)
+        self.root.bind('<Control-y>', self.redo)
+        self.root.protocol('WM_DELETE_WINDOW', self.on_close)
+        self.poll_saver()
+        self.poll_file()
     
     def setup_styles(self):
         """Configure GUI styles"""
@@ -39,7 +120,7 @@ class TodoListGUI:
         style.configure('Treeview', font=('Arial', 10), rowheight=25)
         style.configure('Treeview.Heading', font=('Arial', 10, 'bold'))
     
-    def create_widgets(self):
+    def create_widgets(self, virtual=False):
         """Create all GUI widgets"""
         # Title
         title_frame = ttk.Frame(self.root)
@@ -71,9 +152,19 @@ class TodoListGUI:
                                       state='readonly', width=15)
         priority_combo.grid(row=2, column=1, sticky='w', pady=5)
         
+        # Due date input
+        ttk.Label(input_frame, text="Due (YYYY-MM-DD):").grid(row=3, column=0, sticky='w', pady=5)
+        self.due_entry = ttk.Entry(input_frame, width=18)
+        self.due_entry.grid(row=3, column=1, sticky='w', pady=5)
+        
+        # Tags input, comma-separated
+        ttk.Label(input_frame, text="Tags:").grid(row=4, column=0, sticky='w', pady=5)
+        self.tags_entry = ttk.Entry(input_frame, width=40)
+        self.tags_entry.grid(row=4, column=1, pady=5, sticky='ew')
+        
         # Add button
         add_btn = ttk.Button(input_frame, text="➕ Add Task", command=self.add_task)
-        add_btn.grid(row=2, column=2, pady=5, padx=5)
+        add_btn.grid(row=4, column=2, pady=5, padx=5)
         
         input_frame.columnconfigure(1, weight=1)
         
@@ -82,7 +173,7 @@ class TodoListGUI:
         list_frame.pack(pady=10, padx=20, fill='both', expand=True)
         
         # Create Treeview
-        columns = ('ID', 'Title', 'Description', 'Priority', 'Status', 'Created')
+        columns = ('ID', 'Title', 'Description', 'Priority', 'Status', 'Created', 'Due', 'Tags')
         self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', 
                                  selectmode='browse')
         
@@ -93,6 +184,8 @@ class TodoListGUI:
         self.tree.heading('Priority', text='Priority')
         self.tree.heading('Status', text='Status')
         self.tree.heading('Created', text='Created')
+        self.tree.heading('Due', text='Due')
+        self.tree.heading('Tags', text='Tags')
         
         # Define column widths
         self.tree.column('ID', width=40, anchor='center')
@@ -101,14 +194,25 @@ class TodoListGUI:
         self.tree.column('Priority', width=80, anchor='center')
         self.tree.column('Status', width=100, anchor='center')
         self.tree.column('Created', width=150)
+        self.tree.column('Due', width=100)
+        self.tree.column('Tags', width=120)
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
         
+        # Configure tags for color coding
+        self.tree.tag_configure('high', background='#ffcccc')
+        self.tree.tag_configure('medium', background='#ffffcc')
+        self.tree.tag_configure('low', background='#ccffcc')
+        
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        if virtual:
+            # Rows come from the task model; the scrollbar spans all of them
+            self.view = VirtualTreeview(self.tree, scrollbar, self._row_source)
+        
         # Bind double-click event
         self.tree.bind('<Double-1>', self.on_task_double_click)
         
@@ -126,6 +230,12 @@ class TodoListGUI:
                   command=self.refresh_task_list).pack(side='left', padx=5)
         ttk.Button(button_frame, text="📊 Statistics", 
                   command=self.show_statistics).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="🗄 Archive",
+                  command=self.archive_tasks).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="↶ Undo",
+                  command=self.undo).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="↷ Redo",
+                  command=self.redo).pack(side='left', padx=5)
         
         # Filter Frame
         filter_frame = ttk.Frame(self.root)
@@ -137,26 +247,98 @@ class TodoListGUI:
                                     values=['All', 'Pending', 'Completed'],
                                     state='readonly', width=15)
         filter_combo.pack(side='left', padx=5)
-        filter_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_task_list())
-        
-        # Status bar
-        self.status_bar = ttk.Label(self.root, text="Ready", relief='sunken', anchor='w')
-        self.status_bar.pack(side='bottom', fill='x')
+        filter_combo.bind('<<ComboboxSelected>>', lambda e: self.apply_filter())
+        
+        ttk.Label(filter_frame, text="Dates:").pack(side='left', padx=(20, 5))
+        self.date_var = tk.StringVar(value='Any Time')
+        date_combo = ttk.Combobox(filter_frame, textvariable=self.date_var,
+                                  values=list(DATE_FILTERS), state='readonly', width=20)
+        date_combo.pack(side='left', padx=5)
+        date_combo.bind('<<ComboboxSelected>>', lambda e: self.apply_filter())
+        
+        ttk.Label(filter_frame, text="Search:").pack(side='left', padx=(20, 5))
+        self.search_entry = ttk.Entry(filter_frame, width=30)
+        self.search_entry.pack(side='left', padx=5, fill='x', expand=True)
+        self.search_entry.bind('<KeyRelease>', self.on_search_typed)
+        self._search_job = None
+        
+        # Tag query, e.g. tag:backend AND NOT tag:blocked AND status:Pending
+        query_frame = ttk.Frame(self.root)
+        query_frame.pack(pady=5, padx=20, fill='x')
+        ttk.Label(query_frame, text="Tag Query:").pack(side='left', padx=5)
+        self.tag_query_entry = ttk.Entry(query_frame)
+        self.tag_query_entry.pack(side='left', padx=5, fill='x', expand=True)
+        self.tag_query_entry.bind('<KeyRelease>', self.on_search_typed)
+        
+        # Next Up panel: the pending tasks to do first, by priority and age
+        next_frame = ttk.LabelFrame(self.root, text="Next Up", padding=5)
+        next_frame.pack(pady=5, padx=20, fill='x')
+        self.next_list = tk.Listbox(next_frame, height=NEXT_UP_COUNT, activestyle='none')
+        self.next_list.pack(fill='x')
+        self.next_list.bind('<<ListboxSelect>>', self.on_next_up_select)
+        self._next_ids = []
+        self._next_labels = []
+        
+        # Status bar with a live task counter on the right
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side='bottom', fill='x')
+        self.status_bar = ttk.Label(status_frame, text="Ready", relief='sunken', anchor='w')
+        self.status_bar.pack(side='left', fill='x', expand=True)
+        self.counter_label = ttk.Label(status_frame, relief='sunken', anchor='e')
+        self.counter_label.pack(side='right')
     
-    def load_tasks(self):
-        """Load tasks from JSON file"""
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r') as file:
-                    return json.load(file)
-            except json.JSONDecodeError:
-                return []
-        return []
+    def task_changed(self, task_id, task):
+        """Show a change to one task, ours or another process's"""
+        if task is None:
+            self._drop_row(task_id)
+        else:
+            self._sync_row(task)
+        self.update_counter()
+        self.update_next_up()
+    
+    def tasks_reloaded(self, merged):
+        """Show the tasks after the store replaced them wholesale"""
+        self.refresh_task_list()
+        self.update_next_up()
+        if merged:
+            self.update_status(f"Merged {merged} change(s) with another window's save")
     
-    def save_tasks(self):
-        """Save tasks to JSON file"""
-        with open(self.filename, 'w') as file:
-            json.dump(self.tasks, file, indent=4)
+    def poll_saver(self):
+        """Report failed background saves in the status bar"""
+        saver = self.store.saver
+        if saver is not None:
+            while not saver.errors.empty():
+                error = saver.errors.get()
+                if isinstance(error, StaleFileError):
+                    # Another process saved first; merge before the retry
+                    self.store.sync()
+                else:
+                    self.update_status(f"✗ Could not save tasks: {error}")
+        self.root.after(250, self.poll_saver)
+    
+    def poll_file(self):
+        """Pick up other processes' changes, skipping a turn if the file is busy"""
+        self.store.poll()
+        self.root.after(FILE_POLL_MS, self.poll_file)
+    
+    def on_close(self):
+        """Write pending changes before the window closes"""
+        error = self.store.flush()
+        if error is not None and not messagebox.askyesno(
+                "Save Failed", f"Could not save tasks: {error}\n\nClose anyway?"):
+            return
+        self.store.close()
+        self.root.destroy()
+    
+    def undo(self, event=None):
+        """Undo the last change (Ctrl+Z)"""
+        step = self.store.undo()
+        self.update_status(f"Undone: {step.label}" if step else "Nothing to undo")
+    
+    def redo(self, event=None):
+        """Redo the last undone change (Ctrl+Y)"""
+        step = self.store.redo()
+        self.update_status(f"Redone: {step.label}" if step else "Nothing to redo")
     
     def add_task(self):
         """Add a new task"""
@@ -167,87 +349,232 @@ class TodoListGUI:
         if not title:
             messagebox.showwarning("Warning", "Please enter a task title!")
             return
+        try:
+            due = self.due_entry.get().strip()
+            due_at = parse_due(due) if due else None
+        except ValueError:
+            messagebox.showwarning("Warning", "Please enter the due date as YYYY-MM-DD!")
+            return
         
-        task = {
-            'id': len(self.tasks) + 1,
-            'title': title,
-            'description': description,
-            'priority': priority,
-            'status': 'Pending',
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'completed_at': None
-        }
-        
-        self.tasks.append(task)
-        self.save_tasks()
+        tags = parse_tags(self.tags_entry.get())
+        self.store.create_task(title, description, priority, due_at=due_at, tags=tags)
         
         # Clear inputs
         self.title_entry.delete(0, tk.END)
         self.desc_entry.delete(0, tk.END)
+        self.due_entry.delete(0, tk.END)
+        self.tags_entry.delete(0, tk.END)
         self.priority_var.set('Medium')
         
-        self.refresh_task_list()
         self.update_status(f"Task '{title}' added successfully!")
     
     def refresh_task_list(self):
-        """Refresh the task list display"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Bring the task list display in line with the tasks
+
+        Only rows that are new, changed or gone touch the Treeview; rows
+        outside the status filter are detached rather than deleted.
+        """
+        self._date_filter = self._current_date_filter()
+        self._tag_query = self._current_tag_query()
+        if self.view is not None:
+            self._show_rows([task.id for task in self.store.tasks.values()
+                             if self._matches_filter(task)])
+            return
         
-        # Filter tasks
+        seen = set()
+        visible = []
+        for task in self.store.tasks.values():
+            task_id = task.id
+            seen.add(task_id)
+            values = self._row_values(task)
+            if task_id not in self._rows:
+                self.tree.insert('', 'end', iid=str(task_id), values=values,
+                                 tags=(task.priority.lower(),))
+                self._rows[task_id] = values
+            elif self._rows[task_id] != values:
+                self.tree.item(str(task_id), values=values,
+                               tags=(task.priority.lower(),))
+                self._rows[task_id] = values
+            if self._matches_filter(task):
+                visible.append(task_id)
+        
+        stale = [task_id for task_id in self._rows if task_id not in seen]
+        if stale:
+            self.tree.delete(*[str(task_id) for task_id in stale])
+            for task_id in stale:
+                del self._rows[task_id]
+        
+        self._show_rows(visible)
+    
+    def apply_filter(self):
+        """Reattach the rows matching the filters and detach the rest"""
+        self._search_job = None
+        self._date_filter = self._current_date_filter()
+        self._tag_query = self._current_tag_query()
+        status = self._filter_status()
+        query = self.search_entry.get().strip()
+        if self._tag_query is not None:
+            # Answered with set operations on the tag index
+            visible = [task_id for task_id in self._tag_query.evaluate(self.store.tag_index)
+                       if self._matches_filter(self.store.find_task(task_id))]
+        elif self._date_filter is not None:
+            field, start, end, _ = self._date_filter
+            # The range comes back in time order; the list is in ID order
+            visible = [task_id for task_id in sorted(self.store.timeline.between(field, start, end))
+                       if self._matches_filter(self.store.find_task(task_id))]
+        elif query:
+            visible = self.store.search_index.search(query)
+            if status:
+                visible = [task_id for task_id in visible
+                           if self.store.find_task(task_id).status == status]
+        else:
+            visible = [task.id for task in self.store.filter_tasks(status)]
+        self._show_rows(visible)
+    
+    def on_search_typed(self, event):
+        """Re-filter shortly after the user stops typing in a filter box"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(150, self.apply_filter)
+    
+    def _show_rows(self, visible):
+        """Make exactly the given task IDs the attached rows, in ID order"""
+        # Tasks restored by undo come last in the store; a nearly sorted
+        # list sorts in linear time
+        visible.sort()
+        if self.view is not None:
+            self._visible = visible
+            self.view.set_ids(visible)
+        elif visible != self._visible:
+            self.tree.set_children('', *[str(task_id) for task_id in visible])
+            self._visible = visible
+        if self._tag_query_error:
+            self.update_status(f"✗ Tag query ignored: {self._tag_query_error}")
+        else:
+            self.update_status(f"Showing {len(visible)} task(s)")
+        self.update_counter()
+    
+    def _filter_status(self):
         filter_status = self.filter_var.get()
-        filtered_tasks = self.tasks if filter_status == 'All' else \
-                         [t for t in self.tasks if t['status'] == filter_status]
-        
-        # Add tasks to tree
-        for task in filtered_tasks:
-            # Color code by priority
-            tag = task['priority'].lower()
-            self.tree.insert('', 'end', values=(
-                task['id'],
-                task['title'],
-                task['description'],
-                task['priority'],
-                task['status'],
-                task['created_at']
-            ), tags=(tag,))
-        
-        # Configure tags for color coding
-        self.tree.tag_configure('high', background='#ffcccc')
-        self.tree.tag_configure('medium', background='#ffffcc')
-        self.tree.tag_configure('low', background='#ccffcc')
-        
-        self.update_status(f"Showing {len(filtered_tasks)} task(s)")
+        return None if filter_status == 'All' else filter_status
+    
+    def _current_date_filter(self):
+        """Resolve the selected date filter against the current time"""
+        selected = DATE_FILTERS.get(self.date_var.get())
+        if selected is None:
+            return None
+        field, name, status = selected
+        return (field,) + named_range(name) + (status,)
+    
+    def _current_tag_query(self):
+        """Parse the tag query box; a query that does not parse filters nothing"""
+        self._tag_query_error = None
+        text = self.tag_query_entry.get().strip()
+        if not text:
+            return None
+        try:
+            return TagQuery(text)
+        except ValueError as error:
+            self._tag_query_error = str(error)
+            return None
+    
+    def _matches_filter(self, task):
+        status = self._filter_status()
+        if status is not None and task.status != status:
+            return False
+        if self._tag_query is not None and not self._tag_query.matches(task):
+            return False
+        if self._date_filter is not None:
+            field, start, end, date_status = self._date_filter
+            if date_status is not None and task.status != date_status:
+                return False
+            if not in_range(task, field, start, end):
+                return False
+        query = self.search_entry.get().strip()
+        return not query or self.store.search_index.matches(task.id, query)
+    
+    def _row_values(self, task):
+        return (task.id, task.title, task.description,
+                task.priority, task.status, format_time(task.created_at),
+                format_due(task.due_at) or '', ' '.join(task.tags))
+    
+    def _row_source(self, task_id):
+        """Row values and tags for the virtual list"""
+        task = self.store.find_task(task_id)
+        return self._row_values(task), (task.priority.lower(),)
+    
+    def _sync_row(self, task):
+        """Insert or update the row of one task and show or hide it"""
+        if self.view is not None:
+            self._sync_virtual(task)
+            return
+        task_id = task.id
+        iid = str(task_id)
+        values = self._row_values(task)
+        tags = (task.priority.lower(),)
+        index = bisect_left(self._visible, task_id)
+        if task_id not in self._rows:
+            self.tree.insert('', index, iid=iid, values=values, tags=tags)
+            self._visible.insert(index, task_id)
+        elif self._rows[task_id] != values:
+            self.tree.item(iid, values=values, tags=tags)
+        self._rows[task_id] = values
+        
+        attached = index < len(self._visible) and self._visible[index] == task_id
+        visible = self._matches_filter(task)
+        if visible and not attached:
+            self.tree.move(iid, '', index)
+            self._visible.insert(index, task_id)
+        elif attached and not visible:
+            self.tree.detach(iid)
+            del self._visible[index]
+    
+    def _sync_virtual(self, task):
+        """Update the visible ID list for one task and redraw the window"""
+        task_id = task.id
+        index = bisect_left(self._visible, task_id)
+        attached = index < len(self._visible) and self._visible[index] == task_id
+        visible = self._matches_filter(task)
+        if visible and not attached:
+            self._visible.insert(index, task_id)
+        elif attached and not visible:
+            del self._visible[index]
+        self.view.render()
+    
+    def _drop_row(self, task_id):
+        """Delete the row of a removed task"""
+        if self.view is not None:
+            index = bisect_left(self._visible, task_id)
+            if index < len(self._visible) and self._visible[index] == task_id:
+                del self._visible[index]
+            if self.view.selected == str(task_id):
+                self.view.selected = None
+            self.view.render()
+            return
+        if self._rows.pop(task_id, None) is None:
+            return
+        self.tree.delete(str(task_id))
+        index = bisect_left(self._visible, task_id)
+        if index < len(self._visible) and self._visible[index] == task_id:
+            del self._visible[index]
     
     def mark_complete(self):
         """Mark selected task as completed"""
-        selection = self.tree.selection()
-        if not selection:
+        task_id = self.selected_task_id()
+        if task_id is None:
             messagebox.showwarning("Warning", "Please select a task!")
             return
         
-        item = self.tree.item(selection[0])
-        task_id = item['values'][0]
-        
-        task = self.find_task(task_id)
-        if task:
-            task['status'] = 'Completed'
-            task['completed_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.save_tasks()
-            self.refresh_task_list()
+        if self.store.complete_task(task_id):
             self.update_status(f"Task #{task_id} marked as completed!")
     
     def edit_task(self):
         """Edit selected task"""
-        selection = self.tree.selection()
-        if not selection:
+        task_id = self.selected_task_id()
+        if task_id is None:
             messagebox.showwarning("Warning", "Please select a task!")
             return
-        
-        item = self.tree.item(selection[0])
-        task_id = item['values'][0]
-        task = self.find_task(task_id)
+        task = self.store.find_task(task_id)
         
         if not task:
             return
@@ -255,106 +582,170 @@ class TodoListGUI:
         # Create edit dialog
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit Task")
-        dialog.geometry("400x250")
+        dialog.geometry("400x340")
         dialog.transient(self.root)
         dialog.grab_set()
         
         # Title
         ttk.Label(dialog, text="Title:").grid(row=0, column=0, sticky='w', padx=10, pady=10)
         title_entry = ttk.Entry(dialog, width=30)
-        title_entry.insert(0, task['title'])
+        title_entry.insert(0, task.title)
         title_entry.grid(row=0, column=1, padx=10, pady=10)
         
         # Description
         ttk.Label(dialog, text="Description:").grid(row=1, column=0, sticky='w', padx=10, pady=10)
         desc_entry = ttk.Entry(dialog, width=30)
-        desc_entry.insert(0, task['description'])
+        desc_entry.insert(0, task.description)
         desc_entry.grid(row=1, column=1, padx=10, pady=10)
         
         # Priority
         ttk.Label(dialog, text="Priority:").grid(row=2, column=0, sticky='w', padx=10, pady=10)
-        priority_var = tk.StringVar(value=task['priority'])
+        priority_var = tk.StringVar(value=task.priority)
         priority_combo = ttk.Combobox(dialog, textvariable=priority_var,
                                       values=['Low', 'Medium', 'High'],
                                       state='readonly', width=27)
         priority_combo.grid(row=2, column=1, padx=10, pady=10)
         
+        # Due date; leave empty for none
+        ttk.Label(dialog, text="Due (YYYY-MM-DD):").grid(row=3, column=0, sticky='w', padx=10, pady=10)
+        due_entry = ttk.Entry(dialog, width=30)
+        due_entry.insert(0, format_due(task.due_at) or '')
+        due_entry.grid(row=3, column=1, padx=10, pady=10)
+        
+        # Tags, comma-separated
+        ttk.Label(dialog, text="Tags:").grid(row=4, column=0, sticky='w', padx=10, pady=10)
+        tags_entry = ttk.Entry(dialog, width=30)
+        tags_entry.insert(0, ', '.join(task.tags))
+        tags_entry.grid(row=4, column=1, padx=10, pady=10)
+        
         def save_changes():
-            task['title'] = title_entry.get().strip()
-            task['description'] = desc_entry.get().strip()
-            task['priority'] = priority_var.get()
-            self.save_tasks()
-            self.refresh_task_list()
-            self.update_status(f"Task #{task_id} updated!")
+            try:
+                due = due_entry.get().strip()
+                due_at = parse_due(due) if due else None
+            except ValueError:
+                messagebox.showwarning("Warning", "Please enter the due date as YYYY-MM-DD!",
+                                       parent=dialog)
+                return
+            fields = {
+                'title': title_entry.get().strip(),
+                'description': desc_entry.get().strip(),
+                'priority': priority_var.get(),
+                'due_at': due_at,
+                'tags': parse_tags(tags_entry.get())
+            }
+            if self.store.update_task(task_id, fields):
+                self.update_status(f"Task #{task_id} updated!")
             dialog.destroy()
         
         # Buttons
         btn_frame = ttk.Frame(dialog)
-        btn_frame.grid(row=3, column=0, columnspan=2, pady=20)
+        btn_frame.grid(row=5, column=0, columnspan=2, pady=20)
         ttk.Button(btn_frame, text="Save", command=save_changes).pack(side='left', padx=5)
         ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side='left', padx=5)
     
     def delete_task(self):
         """Delete selected task"""
-        selection = self.tree.selection()
-        if not selection:
+        task_id = self.selected_task_id()
+        if task_id is None:
             messagebox.showwarning("Warning", "Please select a task!")
             return
         
-        item = self.tree.item(selection[0])
-        task_id = item['values'][0]
-        
         if messagebox.askyesno("Confirm", f"Delete task #{task_id}?"):
-            task = self.find_task(task_id)
-            if task:
-                self.tasks.remove(task)
-                # Reassign IDs
-                for i, t in enumerate(self.tasks, 1):
-                    t['id'] = i
-                self.save_tasks()
-                self.refresh_task_list()
+            if self.store.remove_task(task_id):
                 self.update_status(f"Task #{task_id} deleted!")
     
+    def archive_tasks(self):
+        """Move tasks completed more than a chosen number of days ago into the archive"""
+        days = simpledialog.askinteger(
+            "Archive", "Archive tasks completed more than how many days ago?",
+            initialvalue=DEFAULT_ARCHIVE_DAYS, minvalue=0, parent=self.root)
+        if days is None:
+            return
+        count = self.store.archive_tasks(days)
+        self.update_status(f"Archived {count} task(s) completed more than {days} day(s) ago")
+    
     def on_task_double_click(self, event):
         """Handle double-click on task"""
         self.edit_task()
     
     def show_statistics(self):
         """Show task statistics"""
-        total = len(self.tasks)
-        completed = len([t for t in self.tasks if t['status'] == 'Completed'])
-        pending = total - completed
-        
-        high_priority = len([t for t in self.tasks if t['priority'] == 'High'])
-        medium_priority = len([t for t in self.tasks if t['priority'] == 'Medium'])
-        low_priority = len([t for t in self.tasks if t['priority'] == 'Low'])
+        tasks, archived = self.store.statistics()
+        counts = tasks + archived
         
         stats = f"""
          TASK STATISTICS
         ═══════════════════════════════
         
-        Total Tasks: {total}
-        ✓ Completed: {completed}
-        ⏳ Pending: {pending}
+        Total Tasks: {counts.total}
+        ✓ Completed: {counts.completed}
+        ⏳ Pending: {counts.pending}
+        🗄 Archived: {archived.total}
         
         Priority Breakdown:
-        🔴 High: {high_priority}
-        🟡 Medium: {medium_priority}
-        🟢 Low: {low_priority}
+        🔴 High: {counts.by_priority['High']}
+        🟡 Medium: {counts.by_priority['Medium']}
+        🟢 Low: {counts.by_priority['Low']}
         """
         
-        if total > 0:
-            completion_rate = (completed/total)*100
-            stats += f"\n        Completion Rate: {completion_rate:.1f}%"
+        if counts.total > 0:
+            stats += f"\n        Completion Rate: {counts.completion_rate:.1f}%"
+        if counts.mean_completion_seconds is not None:
+            stats += (f"\n        Avg. Time to Complete: "
+                      f"{format_duration(counts.mean_completion_seconds)}")
         
         messagebox.showinfo("Statistics", stats)
     
-    def find_task(self, task_id):
-        """Find a task by ID"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                return task
-        return None
+    def selected_task_id(self):
+        """Return the ID of the selected task, or None"""
+        view = self.view if self.view is not None else self.tree
+        selection = view.selection()
+        return int(selection[0]) if selection else None
+    
+    def update_counter(self):
+        """Show the live task counts in the status bar"""
+        stats = self.store.stats
+        text = (f"{stats.total} tasks | {stats.pending} pending | "
+                f"{stats.completed} done ({stats.completion_rate:.0f}%)")
+        archived = len(self.store.archive)
+        if archived:
+            text += f" | {archived} archived"
+        self.counter_label.config(text=text)
+    
+    def update_next_up(self):
+        """Show the first pending tasks from the priority queue"""
+        ids = self.store.queue.top(NEXT_UP_COUNT)
+        labels = []
+        for task_id in ids:
+            task = self.store.find_task(task_id)
+            labels.append(f"#{task.id}  [{task.priority}]  {task.title}")
+        if labels == self._next_labels:
+            return
+        self._next_ids = ids
+        self._next_labels = labels
+        self.next_list.delete(0, tk.END)
+        self.next_list.insert(tk.END, *labels)
+    
+    def on_next_up_select(self, event):
+        """Select the chosen Next Up task in the task list"""
+        selection = self.next_list.curselection()
+        if selection:
+            self.select_task(self._next_ids[selection[0]])
+    
+    def select_task(self, task_id):
+        """Select and scroll to a task's row if it passes the filters"""
+        index = bisect_left(self._visible, task_id)
+        if index == len(self._visible) or self._visible[index] != task_id:
+            self.update_status(f"Task #{task_id} is hidden by the current filter")
+            return
+        iid = str(task_id)
+        if self.view is not None:
+            self.view.selected = iid
+            self.view.see(task_id)
+            self.view.render()
+        else:
+            self.tree.selection_set(iid)
+            self.tree.see(iid)
     
     def update_status(self, message):
         """Update status bar message"""
@@ -364,7 +755,15 @@ class TodoListGUI:
 def main():
     """Main function to run the GUI application"""
     root = tk.Tk()
-    app = TodoListGUI(root)
+    # An optional argument picks the task file, e.g. tasks.db for SQLite
+    try:
+        app = TodoListGUI(root, *sys.argv[1:2])
+    except TaskFileError as error:
+        filename = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FILE
+        messagebox.showerror("Error", f"Could not read {filename}:\n{error}\n\n"
+                                      f"The file was left as it is.")
+        root.destroy()
+        return
     root.mainloop()
 
 if __name__ == "__main__":
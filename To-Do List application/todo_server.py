@@ -0,0 +1,405 @@
+"""
+HTTP/JSON Server for the To-Do List Application
+Keeps one TaskStore resident so dashboards and scripts can read and
+change tasks without re-reading the task file on every call
+
+Usage: python todo_server.py [--file tasks.json] [--journal] [--host 127.0.0.1] [--port 8765]
+
+    GET    /tasks                 ?status= &q= &where= &overdue=1 &due= &created= &completed=
+    POST   /tasks                 {"title", "description", "priority", "due", "tags"}
+    GET    /tasks/<id>
+    POST   /tasks/<id>/complete
+    DELETE /tasks/<id>
+    GET    /stats
+
+GET responses carry an ETag; a request whose If-None-Match still matches
+gets 304 Not Modified without a body. Writes arriving together are applied
+and saved as one batch before they are answered. With --journal the batches
+are appended to a journal instead of rewriting the task file; this converts
+the file to journal mode for every program that uses it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from task_dates import in_range, parse_range
+from task_file import TaskFileError
+from task_model import now, parse_due
+from task_stats import statistics_dict
+from task_store import DEFAULT_FILE, TaskStore
+from task_tags import TagQuery
+
+# Largest request body accepted, in bytes
+MAX_BODY = 64 * 1024
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+# How often to pick up changes other processes saved to the task file
+SYNC_INTERVAL = 1.0
+# How long the writer waits before trying again while another process holds the file lock
+LOCK_RETRY = 0.01
+# Rendered GET responses kept for the current version of the tasks
+CACHE_SIZE = 256
+
+
+class HTTPError(Exception):
+    """An error answered with an HTTP status and a JSON message"""
+
+    def __init__(self, status, message=None, headers=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _task_id(text):
+    try:
+        return int(text)
+    except ValueError:
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+
+def _allowed(parts):
+    """Return the Allow header of a path, or None if nothing is there"""
+    if parts == ['stats']:
+        return 'GET'
+    if parts == ['tasks']:
+        return 'GET, POST'
+    if len(parts) == 2 and parts[0] == 'tasks':
+        return 'GET, DELETE'
+    if len(parts) == 3 and parts[0] == 'tasks' and parts[2] == 'complete':
+        return 'POST'
+    return None
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+class TodoServer:
+    """Routes HTTP requests to a TaskStore and batches its writes
+
+    Everything runs on one event loop thread, so requests never see the
+    model half-changed. Writes are queued; the writer applies all queued
+    writes inside one TaskStore.batch(), so they share one lock, one
+    catch-up and one save, and answers them once it is written. The file
+    lock is only ever tried, never waited for, so reads keep being served
+    while another process holds it.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Distinguishes ETags of this run from those of an earlier server
+        self.token = os.urandom(4).hex()
+        self.cache = {}
+        self.cache_version = None
+        self.writes = None
+        self.batches = 0
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Listen for connections and start the writer and sync tasks"""
+        self.writes = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._writer()),
+                       asyncio.ensure_future(self._syncer())]
+        self.server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        return self.server
+
+    async def close(self):
+        """Stop serving and let queued writes finish"""
+        self.server.close()
+        await self.server.wait_closed()
+        await self.writes.join()
+        for task in self._tasks:
+            task.cancel()
+
+    # ---- Connections ----
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one keep-alive connection in turn"""
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not line.strip():
+                    break
+                keep_alive = await self._serve_one(line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_one(self, line, reader, writer):
+        """Read one request, write its response and return whether to keep the connection"""
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            self._respond(writer, HTTPStatus.BAD_REQUEST, _encode({'error': 'Bad request line'}))
+            return False
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = header.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.1':
+            keep_alive = connection != 'close'
+        else:
+            keep_alive = connection == 'keep-alive'
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY:
+            self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                          _encode({'error': 'Request body too large'}))
+            return False
+        body = await reader.readexactly(length) if length else b''
+
+        try:
+            status, payload, extra = await self.dispatch(method, target, headers, body)
+        except HTTPError as error:
+            status, payload, extra = error.status, _encode({'error': str(error)}), error.headers
+        except Exception as error:
+            status, payload, extra = (HTTPStatus.INTERNAL_SERVER_ERROR,
+                                      _encode({'error': str(error)}), {})
+        self._respond(writer, status, payload, extra, keep_alive)
+        return keep_alive
+
+    def _respond(self, writer, status, payload=b'', extra=None, keep_alive=False):
+        lines = [f'HTTP/1.1 {status.value} {status.phrase}',
+                 f'Content-Length: {len(payload)}',
+                 'Connection: ' + ('keep-alive' if keep_alive else 'close')]
+        if payload:
+            lines.append('Content-Type: application/json; charset=utf-8')
+        lines.extend(f'{name}: {value}' for name, value in (extra or {}).items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+
+    # ---- Routing ----
+
+    async def dispatch(self, method, target, headers, body):
+        """Return (status, JSON body bytes, extra headers) for a request"""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        if method == 'GET':
+            return self._get(target, parts, parse_qs(url.query), headers)
+        if parts == ['tasks'] and method == 'POST':
+            data = self._json(body)
+            task = await self._write(lambda: self._add(data))
+            return HTTPStatus.CREATED, _encode(task.to_dict()), {'Location': f'/tasks/{task.id}'}
+        if len(parts) == 3 and parts[0] == 'tasks' and parts[2] == 'complete' and method == 'POST':
+            task_id = _task_id(parts[1])
+            task = await self._write(lambda: self.store.complete_task(task_id))
+            if task is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Task #{task_id} not found")
+            return HTTPStatus.OK, _encode(task.to_dict()), {}
+        if len(parts) == 2 and parts[0] == 'tasks' and method == 'DELETE':
+            task_id = _task_id(parts[1])
+            if await self._write(lambda: self.store.remove_task(task_id)) is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Task #{task_id} not found")
+            return HTTPStatus.NO_CONTENT, b'', {}
+        allowed = _allowed(parts)
+        if allowed is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, headers={'Allow': allowed})
+
+    def _get(self, target, parts, query, headers):
+        """Answer a read from the resident tasks, or 304 if the client's copy is current"""
+        store = self.store
+        etag = f'"{self.token}-{store.version}"'
+        match = headers.get('if-none-match')
+        if match and (match == '*' or etag in match):
+            return HTTPStatus.NOT_MODIFIED, b'', {'ETag': etag}
+        if self.cache_version != store.version:
+            self.cache = {}
+            self.cache_version = store.version
+        payload = self.cache.get(target)
+        if payload is None:
+            if parts == ['tasks']:
+                payload = _encode([task.to_dict() for task in self._list(query)])
+            elif parts == ['stats']:
+                payload = _encode(statistics_dict(*store.statistics()))
+            elif len(parts) == 2 and parts[0] == 'tasks':
+                task = store.find_task(_task_id(parts[1]))
+                if task is None:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f"Task #{parts[1]} not found")
+                payload = _encode(task.to_dict())
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND)
+            if len(self.cache) >= CACHE_SIZE:
+                self.cache.clear()
+            self.cache[target] = payload
+        return HTTPStatus.OK, payload, {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+    def _list(self, query):
+        """Return the tasks selected by the query string of GET /tasks"""
+        def value(name):
+            values = query.get(name)
+            return values[-1] if values else None
+
+        status = value('status')
+        ranges = []
+        if value('overdue') in ('1', 'true', 'yes'):
+            ranges.append(('due_at', None, now()))
+            status = status or 'Pending'
+        for field, name in (('due_at', 'due'), ('created_at', 'created'),
+                            ('completed_at', 'completed')):
+            text = value(name)
+            if text:
+                try:
+                    ranges.append((field,) + parse_range(text))
+                except ValueError:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, f"Bad date range for {name}: {text!r}")
+        where = None
+        if value('where'):
+            try:
+                where = TagQuery(value('where'))
+            except ValueError as error:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"Bad tag query: {error}")
+        words = value('q')
+        if words:
+            return [task for task in self.store.search_tasks(words, status)
+                    if all(in_range(task, *bounds) for bounds in ranges)
+                    and (where is None or where.matches(task))]
+        return self.store.query_tasks(status, ranges, where)
+
+    def _json(self, body):
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return data
+
+    def _add(self, data):
+        title = str(data.get('title') or '').strip()
+        if not title:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "A task needs a title")
+        priority = data.get('priority') or 'Medium'
+        if priority not in ('Low', 'Medium', 'High'):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Priority must be Low, Medium or High")
+        due_at = None
+        if data.get('due'):
+            try:
+                due_at = parse_due(str(data['due']))
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Due date must be YYYY-MM-DD")
+        tags = data.get('tags') or []
+        if not (isinstance(tags, str)
+                or isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Tags must be a list or a string")
+        return self.store.create_task(title, str(data.get('description') or ''), priority,
+                                      due_at=due_at, tags=tags)
+
+    # ---- Writes ----
+
+    def _write(self, change):
+        """Queue a change for the writer; the future resolves once it is saved"""
+        future = asyncio.get_event_loop().create_future()
+        self.writes.put_nowait((change, future))
+        return future
+
+    async def _writer(self):
+        """Apply queued changes in batches with one commit each"""
+        while True:
+            jobs = [await self.writes.get()]
+            # Let the requests already read queue their changes too
+            await asyncio.sleep(0)
+            while not self.writes.empty():
+                jobs.append(self.writes.get_nowait())
+            results = []
+            try:
+                while not self.store.acquire(blocking=False):
+                    # Another process is saving; keep serving reads meanwhile
+                    await asyncio.sleep(LOCK_RETRY)
+                try:
+                    with self.store.batch():
+                        for change, _ in jobs:
+                            try:
+                                results.append((change(), None))
+                            except Exception as error:
+                                results.append((None, error))
+                finally:
+                    self.store.release()
+            except Exception as error:
+                results = [(None, self._commit_error(error))] * len(jobs)
+            self.batches += 1
+            for (_, future), (result, error) in zip(jobs, results):
+                if not future.cancelled():
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+                self.writes.task_done()
+
+    def _commit_error(self, error):
+        """Describe what a failed batch commit left saved"""
+        if self.store.db is not None:
+            # The database rolled the whole transaction back
+            return HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Nothing was saved: {error}")
+        # The changes stay applied in memory, and the journal may already
+        # hold some or all of them
+        return HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR,
+                         f"Changes were applied but may be only partly saved: {error}")
+
+    async def _syncer(self):
+        """Pick up other processes' changes between requests"""
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL)
+            # Skips a turn rather than block the event loop on the file lock
+            self.store.poll()
+
+
+async def serve(filename=DEFAULT_FILE, host='127.0.0.1', port=8765, journal=False):
+    """Run a server on a task file until cancelled
+
+    With journal, batches are appended to a journal rather than rewriting
+    the file, which switches the file to journal mode for good.
+    """
+    store = TaskStore(filename, journal=journal)
+    server = TodoServer(store)
+    listener = await server.start(host, port)
+    address = listener.sockets[0].getsockname()
+    mode = 'SQLite' if store.db is not None else 'journaled' if store.journal else 'rewritten on save'
+    print(f"Serving {filename} ({mode}) on http://{address[0]}:{address[1]}/ (Ctrl+C to stop)",
+          flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        store.close()
+
+
+def run_server(filename=DEFAULT_FILE, host='127.0.0.1', port=8765, journal=False):
+    """Serve a task file until interrupted"""
+    try:
+        asyncio.run(serve(filename, host, port, journal))
+    except KeyboardInterrupt:
+        print("\nServer stopped")
+    except TaskFileError as error:
+        print(f"✗ Could not read {filename}: {error}. The file was left as it is.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--file', default=DEFAULT_FILE,
+                        help="task file (.json, or .db for SQLite) [tasks.json]")
+    parser.add_argument('--journal', action='store_true',
+                        help="append changes to a journal; converts the task file to journal mode")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help="0 picks a free port")
+    args = parser.parse_args()
+    run_server(args.file, args.host, args.port, args.journal)
+
+
+if __name__ == "__main__":
+    main()
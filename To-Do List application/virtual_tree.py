@@ -0,0 +1,143 @@
+"""
+Virtual Scrolling for the To-Do List GUI
+Shows a window of a long row list in a ttk.Treeview so that only the rows
+in view (plus a small buffer) exist as Tk items
+"""
+
+from bisect import bisect_left
+
+
+class VirtualTreeview:
+    """Drive a Treeview and its scrollbar from a list of row IDs
+
+    ids must be sorted ascending. row_source(row_id) returns the
+    (values, tags) of a row and is only called for rows in the window.
+    """
+
+    def __init__(self, tree, scrollbar, row_source, buffer=10, row_height=25):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_source = row_source
+        self.buffer = buffer
+        self.row_height = row_height
+        self.ids = []
+        self.top = 0
+        self.selected = None
+        # Values and tags of the rows currently inserted, keyed by iid
+        self._shown = {}
+
+        self.scrollbar.configure(command=self.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: None)
+        self.tree.bind('<Configure>', lambda e: self.render())
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self._step_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._step_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.scroll(-self.viewport_rows()))
+        self.tree.bind('<Next>', lambda e: self.scroll(self.viewport_rows()))
+
+    def set_ids(self, ids):
+        """Replace the row list and redraw"""
+        self.ids = ids
+        self.render()
+
+    def viewport_rows(self):
+        """Number of rows that fit in the Treeview"""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            # Not mapped yet; fall back to the configured height in rows
+            return int(self.tree.cget('height'))
+        return max(1, height // self.row_height)
+
+    def render(self):
+        """Materialise the rows in the viewport and update the scrollbar"""
+        rows = self.viewport_rows()
+        self.top = max(0, min(self.top, len(self.ids) - rows))
+        window = self.ids[self.top:self.top + rows + self.buffer]
+
+        wanted = {}
+        for row_id in window:
+            iid = str(row_id)
+            row = self.row_source(row_id)
+            old = self._shown.get(iid)
+            if old is None:
+                self.tree.insert('', 'end', iid=iid, values=row[0], tags=row[1])
+            elif old != row:
+                self.tree.item(iid, values=row[0], tags=row[1])
+            wanted[iid] = row
+        stale = [iid for iid in self._shown if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        self.tree.set_children('', *wanted)
+        self._shown = wanted
+        self.tree.yview_moveto(0)
+        if self.selected in wanted:
+            self.tree.selection_set(self.selected)
+
+        total = len(self.ids)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """Scrollbar command: 'moveto FRACTION' or 'scroll N units|pages'"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.ids)))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.viewport_rows()
+            self.scroll(amount)
+
+    def scroll(self, amount):
+        """Scroll by a number of rows"""
+        self.scroll_to(self.top + amount)
+        return 'break'
+
+    def scroll_to(self, top):
+        """Make the row at position top the first visible row"""
+        top = max(0, min(top, len(self.ids) - self.viewport_rows()))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def see(self, row_id):
+        """Scroll so that a row is visible"""
+        index = bisect_left(self.ids, row_id)
+        rows = self.viewport_rows()
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + rows:
+            self.scroll_to(index - rows + 1)
+
+    def selection(self):
+        """Return the selected row ID, like Treeview.selection()"""
+        return (self.selected,) if self.selected is not None else ()
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected = selection[0]
+        elif self.selected in self._shown:
+            # Deselected while in view; a row scrolled out keeps its selection
+            self.selected = None
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _step_selection(self, step):
+        """Move the selection with the arrow keys across the whole list"""
+        if not self.ids:
+            return 'break'
+        if self.selected is None:
+            index = self.top
+        else:
+            index = bisect_left(self.ids, int(self.selected)) + step
+        index = max(0, min(index, len(self.ids) - 1))
+        self.selected = str(self.ids[index])
+        self.see(self.ids[index])
+        self.render()
+        return 'break'
@@ -0,0 +1,108 @@
+"""
+Contact Import/Export Benchmark
+Writes a synthetic CSV and vCard fixture, then times streaming import of
+each into an empty ContactBook (parse, phone dedup, indexing and the single
+save) and streaming export back out, in records per second
+
+Usage: python benchmarks/bench_contacts_io.py [--rows 1000000] [--duplicates 0.02]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from contact_book import ContactBook, normalize_phone
+import contact_io
+
+FIRST_NAMES = ("Ann", "Bob", "Cara", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivo", "Jun")
+LAST_NAMES = ("Lee", "Stone", "Garcia", "Nguyen", "Smith", "Okafor", "Novak", "Rossi")
+# Ways people write the same North American number
+PHONE_STYLES = ("+1 ({0}) {1}-{2}", "{0}-{1}-{2}", "{0}{1}{2}", "1 {0} {1} {2}")
+
+
+def make_rows(count, duplicates, seed=1):
+    """
+    Yields count (name, phone, email, address) rows; about `duplicates` of
+    them reuse an earlier number written differently.
+    """
+    rng = random.Random(seed)
+    for number in range(count):
+        if number and rng.random() < duplicates:
+            digits = f"{rng.randrange(number):010d}"
+        else:
+            digits = f"{number:010d}"
+        style = PHONE_STYLES[number % len(PHONE_STYLES)]
+        phone = style.format(digits[:3], digits[3:6], digits[6:])
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}"
+        yield name, phone, f"person{number}@example.com", f"{number} Main Street, Springfield"
+
+
+def write_fixtures(directory, count, duplicates):
+    """
+    Writes fixture.csv and fixture.vcf with the same rows; returns their paths.
+    """
+    csv_path = os.path.join(directory, "fixture.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(("Full Name", "Mobile", "Email", "Address"))
+        writer.writerows(make_rows(count, duplicates))
+
+    # write_vcard() takes the canonical numbers a ContactBook stores
+    vcard_path = os.path.join(directory, "fixture.vcf")
+    contacts = ({"name": name, "phone": normalize_phone(phone), "email": email, "address": address}
+                for name, phone, email, address in make_rows(count, duplicates))
+    contact_io.write_vcard(contacts, vcard_path, "3.0")
+    return csv_path, vcard_path
+
+
+def timed(label, count, function):
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    print(f"{label:<34} {count:>10} {seconds:>9.2f} {count / max(seconds, 1e-9):>12,.0f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--duplicates", type=float, default=0.02,
+                        help="share of rows repeating an earlier number")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {args.rows} row fixtures...")
+        csv_path, vcard_path = write_fixtures(tmp, args.rows, args.duplicates)
+        sizes = {path: os.path.getsize(path) / 1e6 for path in (csv_path, vcard_path)}
+        print(f"  fixture.csv {sizes[csv_path]:.0f} MB, fixture.vcf {sizes[vcard_path]:.0f} MB\n")
+
+        print(f"{'Step':<34} {'Records':>10} {'Seconds':>9} {'Records/s':>12}")
+        timed("Parse CSV", args.rows, lambda: sum(1 for _ in contact_io.read_csv(csv_path)))
+        timed("Parse vCard", args.rows, lambda: sum(1 for _ in contact_io.read_vcard(vcard_path)))
+
+        results = {}
+        for label, path in (("CSV", csv_path), ("vCard", vcard_path)):
+            book = ContactBook(os.path.join(tmp, f"contacts_{label.lower()}.json"))
+            results[label] = timed(f"Import {label} (dedup, index, save)", args.rows,
+                                   lambda: book.import_contacts(contact_io.read_contacts(path)))
+
+        count = len(book)
+        timed("Export CSV", count,
+              lambda: contact_io.write_csv(book.contacts.values(), os.path.join(tmp, "out.csv")))
+        timed("Export vCard 4.0", count,
+              lambda: contact_io.write_vcard(book.contacts.values(), os.path.join(tmp, "out.vcf")))
+
+        for label, (added, duplicates, invalid) in results.items():
+            print(f"\n{label}: {added} added, {duplicates} duplicate numbers, {invalid} invalid", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
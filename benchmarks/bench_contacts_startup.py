@@ -0,0 +1,92 @@
+"""
+Contact Manager Startup Benchmark
+Measures how long the contact modules take to import and which heavy
+modules they pull in, each in a fresh interpreter, and how long opening a
+ContactBook takes. Fails if the headless engine imports tkinter.
+
+Usage: python benchmarks/bench_contacts_startup.py [--runs 10] [--contacts 10000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ENTRY_POINTS = ("contact_search", "contact_book", "contact_manager")
+HEAVY_MODULES = ("tkinter", "_tkinter")
+# Modules that must load without a GUI
+HEADLESS = ("contact_search", "contact_book")
+
+
+def import_profile(module):
+    """
+    Returns (milliseconds to import module, names of all modules imported).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    total = None
+    names = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        names.add(name)
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, names
+
+
+def make_contacts(count):
+    """
+    Returns count synthetic contacts as saved in contacts.json.
+    """
+    return [{"id": number, "name": f"Person {number} Example", "phone": f"+1 555 {number:07d}",
+             "email": f"person{number}@example.com", "address": f"{number} Main Street"}
+            for number in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--contacts", type=int, default=10000, help="contacts in the file opened")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'Module':<16} {'Import ms':>10}  Loads")
+    for module in ENTRY_POINTS:
+        samples = []
+        for _ in range(args.runs):
+            total, names = import_profile(module)
+            samples.append(total)
+        loaded = [heavy for heavy in HEAVY_MODULES if heavy in names]
+        print(f"{module:<16} {statistics.median(samples):>10.1f}  {', '.join(loaded) or '-'}")
+        if module in HEADLESS and loaded:
+            print(f"  ✗ {module} should not import {', '.join(loaded)}")
+            failed = True
+
+    from contact_book import ContactBook
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "contacts.json")
+        with open(filename, "w") as file:
+            json.dump(make_contacts(args.contacts), file)
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            ContactBook(filename)
+            samples.append(time.perf_counter() - start)
+        print(f"\nOpening {args.contacts} contacts (load + index): "
+              f"{statistics.median(samples) * 1000:.1f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# -------------------- IMPORT REQUIRED MODULES --------------------
+
+import csv                            # For CSV files
+import re                             # For splitting vCard values
+
+from contact_book import FIELDS       # name, phone, email, address
+
+# -------------------- FORMAT CONFIGURATION --------------------
+
+# Lowercased CSV headers recognised for each field
+CSV_COLUMNS = {
+    "name": ("name", "full name", "display name", "contact name"),
+    "phone": ("phone", "phone number", "mobile", "mobile phone", "cell", "telephone", "tel"),
+    "email": ("email", "e-mail", "email address", "e-mail address"),
+    "address": ("address", "street address", "home address", "postal address"),
+}
+FIRST_NAME_COLUMNS = ("first name", "given name")
+LAST_NAME_COLUMNS = ("last name", "family name", "surname")
+
+VCARD_VERSIONS = ("3.0", "4.0")
+VCARD_LINE_LENGTH = 75                # Longer lines are folded
+UNESCAPED_SEMICOLON = re.compile(r"(?<!\\);")
+VCARD_ESCAPES = {"\\n": "\n", "\\N": "\n", "\\,": ",", "\\;": ";", "\\\\": "\\"}
+VCARD_ESCAPE = re.compile(r"\\[nN,;\\]")
+VCARD_PROPERTIES = ("FN", "N", "TEL", "EMAIL", "ADR")   # The ones read
+
+
+def contact_format(path):
+    """
+    Returns "csv" or "vcard" from the file extension of path.
+    """
+    lowered = path.lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith((".vcf", ".vcard")):
+        return "vcard"
+    raise ValueError(f"{path}: expected a .csv, .vcf or .vcard file")
+
+
+def parse_mapping(pairs):
+    """
+    Turns ["phone=Mobile", ...] into {"phone": "Mobile", ...}.
+    """
+    mapping = {}
+    for pair in pairs or ():
+        field, sep, column = pair.partition("=")
+        field = field.strip().lower()
+        if not sep or field not in FIELDS or not column.strip():
+            raise ValueError(f"bad mapping {pair!r}: expected FIELD=COLUMN with FIELD one of {', '.join(FIELDS)}")
+        mapping[field] = column.strip()
+    return mapping
+
+
+def read_contacts(path, mapping=None):
+    """
+    Streams contact dicts from a .csv or .vcf file.
+    """
+    if contact_format(path) == "csv":
+        return read_csv(path, mapping)
+    return read_vcard(path)
+
+
+def write_contacts(contacts, path, version="4.0"):
+    """
+    Streams contacts to a .csv or .vcf file and returns how many were written.
+    """
+    if contact_format(path) == "csv":
+        return write_csv(contacts, path)
+    return write_vcard(contacts, path, version)
+
+
+def international_phone(phone):
+    """
+    Writes canonical digits with a "+" when they include a country code.
+    """
+    return "+" + phone if len(phone) > 10 else phone
+
+
+# -------------------- CSV --------------------
+
+def read_csv(path, mapping=None):
+    """
+    Streams contact dicts from a CSV file with a header row.
+
+    Columns are found by their usual names (see CSV_COLUMNS), or by
+    mapping, e.g. {"phone": "Work Phone"}. Without a name column, the
+    first and last name columns are joined. Raises ValueError if no
+    column holds the name or the phone number.
+    """
+    mapping = mapping or {}
+    with open(path, "r", newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        header = [column.strip().lower() for column in next(reader, [])]
+        position = {column: index for index, column in reversed(list(enumerate(header)))}
+
+        columns = {}
+        for field in FIELDS:
+            names = (mapping[field].strip().lower(),) if field in mapping else CSV_COLUMNS[field]
+            for name in names:
+                if name in position:
+                    columns[field] = position[name]
+                    break
+            else:
+                if field in mapping:
+                    raise ValueError(f"{path}: no column named {mapping[field]!r}")
+
+        first = next((position[name] for name in FIRST_NAME_COLUMNS if name in position), None)
+        last = next((position[name] for name in LAST_NAME_COLUMNS if name in position), None)
+        if "name" not in columns and first is None and last is None:
+            raise ValueError(f"{path}: no name column; map one with name=COLUMN")
+        if "phone" not in columns:
+            raise ValueError(f"{path}: no phone column; map one with phone=COLUMN")
+
+        fields = list(columns.items())
+        for row in reader:
+            width = len(row)
+            contact = {field: row[index] if index < width else "" for field, index in fields}
+            if "name" not in contact:
+                parts = [row[index] for index in (first, last) if index is not None and index < width]
+                contact["name"] = " ".join(part.strip() for part in parts if part.strip())
+            yield contact
+
+
+def write_csv(contacts, path):
+    """
+    Streams contacts to a CSV file, one row at a time.
+    Returns how many were written.
+    """
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        for contact in contacts:
+            writer.writerow((contact["name"], international_phone(contact["phone"]),
+                             contact.get("email", ""), contact.get("address", "")))
+            count += 1
+    return count
+
+
+# -------------------- VCARD --------------------
+
+def read_vcard(path):
+    """
+    Streams contact dicts from a vCard 3.0 or 4.0 file, one card at a time.
+
+    The name is FN (or N), the phone the preferred or first TEL, the
+    email the preferred or first EMAIL and the address the first ADR.
+    """
+    with open(path, "r", encoding="utf-8-sig") as file:
+        card = None
+        for line in _unfold(file):
+            head, _, value = line.partition(":")
+            name, _, params = head.partition(";")
+            name = name.rpartition(".")[2].upper()     # Drop groups like "item1."
+            if name in VCARD_PROPERTIES:
+                if card is not None:
+                    card.setdefault(name, []).append((params, value))
+            elif name == "BEGIN" and value.strip().upper() == "VCARD":
+                card = {}
+            elif name == "END" and card is not None:
+                yield _card_contact(card)
+                card = None
+
+
+def _unfold(lines):
+    """
+    Yields the content lines of a vCard file with folded lines joined.
+    """
+    pending = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]       # Folded continuation
+            continue
+        if pending:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def _unescape(value):
+    if "\\" not in value:
+        return value
+    return VCARD_ESCAPE.sub(lambda match: VCARD_ESCAPES[match.group()], value)
+
+
+def _escape(value):
+    return (value.replace("\\", "\\\\").replace(",", "\\,")
+            .replace(";", "\\;").replace("\n", "\\n"))
+
+
+def _preferred(values):
+    """
+    Returns the value marked preferred (TYPE=pref or PREF=1), else the first.
+    """
+    if len(values) > 1:
+        for params, value in values:
+            for param in params.upper().split(";"):
+                if param == "PREF" or param.startswith("PREF=") or (
+                        param.startswith("TYPE=") and "PREF" in param[5:].strip('"').split(",")):
+                    return value
+    return values[0][1]
+
+
+def _card_contact(card):
+    contact = {"name": "", "phone": "", "email": "", "address": ""}
+
+    if "FN" in card:
+        contact["name"] = _unescape(card["FN"][0][1]).strip()
+    elif "N" in card:
+        parts = [_unescape(part).strip() for part in UNESCAPED_SEMICOLON.split(card["N"][0][1])]
+        parts += [""] * (5 - len(parts))
+        family, given, additional, prefix, suffix = parts[:5]
+        contact["name"] = " ".join(part for part in (prefix, given, additional, family, suffix) if part)
+
+    if "TEL" in card:
+        phone = _unescape(_preferred(card["TEL"])).strip()
+        if phone.lower().startswith("tel:"):
+            phone = phone[4:].split(";", 1)[0]      # vCard 4.0 URI, without ;ext=
+        contact["phone"] = phone
+
+    if "EMAIL" in card:
+        contact["email"] = _unescape(_preferred(card["EMAIL"])).strip()
+
+    if "ADR" in card:
+        parts = [_unescape(part).strip() for part in UNESCAPED_SEMICOLON.split(card["ADR"][0][1])]
+        contact["address"] = ", ".join(part for part in parts if part)
+
+    return contact
+
+
+def _fold(line):
+    """
+    Folds a content line into lines of at most VCARD_LINE_LENGTH octets of
+    UTF-8, as RFC 6350 and 2426 count them, never splitting a character.
+    """
+    if line.isascii():
+        # One octet per character
+        if len(line) <= VCARD_LINE_LENGTH:
+            return line + "\r\n"
+        pieces = [line[:VCARD_LINE_LENGTH]]
+        for start in range(VCARD_LINE_LENGTH, len(line), VCARD_LINE_LENGTH - 1):
+            pieces.append(" " + line[start:start + VCARD_LINE_LENGTH - 1])
+        return "\r\n".join(pieces) + "\r\n"
+
+    data = line.encode("utf-8")
+    pieces = []
+    start = 0
+    limit = VCARD_LINE_LENGTH
+    while len(data) - start > limit:
+        end = start + limit
+        while data[end] & 0xC0 == 0x80:       # Back up to the first octet of a character
+            end -= 1
+        pieces.append(data[start:end].decode("utf-8"))
+        start = end
+        limit = VCARD_LINE_LENGTH - 1         # Continuation lines start with a space
+    pieces.append(data[start:].decode("utf-8"))
+    return "\r\n ".join(pieces) + "\r\n"
+
+
+def write_vcard(contacts, path, version="4.0"):
+    """
+    Streams contacts to a vCard 3.0 or 4.0 file, one card at a time.
+    Returns how many were written.
+    """
+    if version not in VCARD_VERSIONS:
+        raise ValueError(f"vCard version must be one of {', '.join(VCARD_VERSIONS)}")
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        for contact in contacts:
+            name = contact["name"]
+            given, _, family = name.rpartition(" ")
+            if not given:
+                given, family = family, ""
+            phone = international_phone(contact["phone"])
+
+            lines = ["BEGIN:VCARD", f"VERSION:{version}", f"FN:{_escape(name)}",
+                     f"N:{_escape(family)};{_escape(given)};;;"]
+            if version == "4.0":
+                lines.append(f"TEL;VALUE=uri;TYPE=cell:tel:{phone}")
+            else:
+                lines.append(f"TEL;TYPE=CELL:{phone}")
+            if contact.get("email"):
+                lines.append(f"EMAIL:{_escape(contact['email'])}")
+            if contact.get("address"):
+                lines.append(f"ADR:;;{_escape(contact['address'])};;;;")
+            lines.append("END:VCARD")
+
+            file.write("".join(_fold(line) for line in lines))
+            count += 1
+    return count
@@ -1,259 +1,375 @@
-# -------------------- IMPORT REQUIRED MODULES --------------------
-
-import tkinter as tk                  # For GUI
-from tkinter import messagebox        # For popup messages
-import json                           # For storing contacts in JSON format
-import os                             # To check if file exists
-
-# -------------------- FILE CONFIGURATION --------------------
-
-FILE_NAME = "contacts.json"           # File where contacts will be stored
-
-
-# -------------------- LOAD CONTACTS FROM FILE --------------------
-
-def load_contacts():
-    """
-    Loads contacts from JSON file.
-    If file does not exist, return empty list.
-    """
-    if os.path.exists(FILE_NAME):
-        with open(FILE_NAME, "r") as file:
-            return json.load(file)
-    return []
-
-
-# -------------------- SAVE CONTACTS TO FILE --------------------
-
-def save_contacts():
-    """
-    Saves the current contacts list to JSON file.
-    """
-    with open(FILE_NAME, "w") as file:
-        json.dump(contacts, file, indent=4)
-
-
-# Load contacts when program starts
-contacts = load_contacts()
-
-
-# -------------------- CREATE MAIN WINDOW --------------------
-
-root = tk.Tk()
-root.title("Contact Management System")
-root.geometry("750x550")
-root.configure(bg="#e6f2ff")   # Light blue background
-
-
-# -------------------- CREATE FRAMES FOR BETTER LAYOUT --------------------
-
-# Frame for input fields
-input_frame = tk.Frame(root, bg="#e6f2ff")
-input_frame.pack(pady=10)
-
-# Frame for buttons
-button_frame = tk.Frame(root, bg="#e6f2ff")
-button_frame.pack(pady=10)
-
-# Frame for search
-search_frame = tk.Frame(root, bg="#e6f2ff")
-search_frame.pack(pady=10)
-
-# Frame for contact list
-list_frame = tk.Frame(root, bg="#e6f2ff")
-list_frame.pack(pady=10)
-
-
-# -------------------- INPUT FIELDS --------------------
-
-# Labels and Entry widgets arranged using grid
-
-tk.Label(input_frame, text="Name:", bg="#e6f2ff", font=("Arial", 11)).grid(row=0, column=0, padx=5, pady=5)
-entry_name = tk.Entry(input_frame, width=30)
-entry_name.grid(row=0, column=1, padx=5, pady=5)
-
-tk.Label(input_frame, text="Phone:", bg="#e6f2ff", font=("Arial", 11)).grid(row=1, column=0, padx=5, pady=5)
-entry_phone = tk.Entry(input_frame, width=30)
-entry_phone.grid(row=1, column=1, padx=5, pady=5)
-
-tk.Label(input_frame, text="Email:", bg="#e6f2ff", font=("Arial", 11)).grid(row=2, column=0, padx=5, pady=5)
-entry_email = tk.Entry(input_frame, width=30)
-entry_email.grid(row=2, column=1, padx=5, pady=5)
-
-tk.Label(input_frame, text="Address:", bg="#e6f2ff", font=("Arial", 11)).grid(row=3, column=0, padx=5, pady=5)
-entry_address = tk.Entry(input_frame, width=30)
-entry_address.grid(row=3, column=1, padx=5, pady=5)
-
-
-# -------------------- FUNCTION TO ADD CONTACT --------------------
-
-def add_contact():
-    """
-    Adds a new contact to the list.
-    """
-    name = entry_name.get()
-    phone = entry_phone.get()
-    email = entry_email.get()
-    address = entry_address.get()
-
-    # Check if required fields are filled
-    if name == "" or phone == "":
-        messagebox.showerror("Error", "Name and Phone are required!")
-        return
-
-    # Add contact to list
-    contacts.append({
-        "name": name,
-        "phone": phone,
-        "email": email,
-        "address": address
-    })
-
-    save_contacts()     # Save to file
-    view_contacts()     # Refresh listbox
-    clear_fields()      # Clear input fields
-    messagebox.showinfo("Success", "Contact Added Successfully!")
-
-
-# -------------------- FUNCTION TO VIEW CONTACTS --------------------
-
-def view_contacts():
-    """
-    Displays all contacts in the listbox.
-    """
-    listbox.delete(0, tk.END)
-    for contact in contacts:
-        listbox.insert(tk.END, f"{contact['name']}  |  {contact['phone']}")
-
-
-# -------------------- FUNCTION TO SEARCH CONTACT --------------------
-
-def search_contact():
-    """
-    Searches contacts by name or phone.
-    """
-    keyword = entry_search.get().lower()
-    listbox.delete(0, tk.END)
-
-    for contact in contacts:
-        if keyword in contact["name"].lower() or keyword in contact["phone"]:
-            listbox.insert(tk.END, f"{contact['name']}  |  {contact['phone']}")
-
-
-# -------------------- FUNCTION TO UPDATE CONTACT --------------------
-
-def update_contact():
-    """
-    Updates selected contact details.
-    """
-    selected = listbox.curselection()
-
-    if not selected:
-        messagebox.showerror("Error", "Select a contact to update")
-        return
-
-    index = selected[0]
-
-    contacts[index] = {
-        "name": entry_name.get(),
-        "phone": entry_phone.get(),
-        "email": entry_email.get(),
-        "address": entry_address.get()
-    }
-
-    save_contacts()
-    view_contacts()
-    clear_fields()
-    messagebox.showinfo("Success", "Contact Updated Successfully!")
-
-
-# -------------------- FUNCTION TO DELETE CONTACT --------------------
-
-def delete_contact():
-    """
-    Deletes selected contact.
-    """
-    selected = listbox.curselection()
-
-    if not selected:
-        messagebox.showerror("Error", "Select a contact to delete")
-        return
-
-    index = selected[0]
-    contacts.pop(index)
-
-    save_contacts()
-    view_contacts()
-    clear_fields()
-    messagebox.showinfo("Success", "Contact Deleted Successfully!")
-
-
-# -------------------- FILL FIELDS WHEN CONTACT IS SELECTED --------------------
-
-def fill_fields(event):
-    """
-    When user selects a contact from list,
-    automatically fill input fields.
-    """
-    selected = listbox.curselection()
-
-    if selected:
-        contact = contacts[selected[0]]
-
-        entry_name.delete(0, tk.END)
-        entry_name.insert(0, contact["name"])
-
-        entry_phone.delete(0, tk.END)
-        entry_phone.insert(0, contact["phone"])
-
-        entry_email.delete(0, tk.END)
-        entry_email.insert(0, contact["email"])
-
-        entry_address.delete(0, tk.END)
-        entry_address.insert(0, contact["address"])
-
-
-# -------------------- CLEAR INPUT FIELDS --------------------
-
-def clear_fields():
-    """
-    Clears all input fields.
-    """
-    entry_name.delete(0, tk.END)
-    entry_phone.delete(0, tk.END)
-    entry_email.delete(0, tk.END)
-    entry_address.delete(0, tk.END)
-    entry_search.delete(0, tk.END)
-
-
-# -------------------- BUTTONS --------------------
-
-tk.Button(button_frame, text="Add", width=15, bg="#4CAF50", fg="white", command=add_contact).grid(row=0, column=0, padx=5)
-tk.Button(button_frame, text="Update", width=15, bg="#2196F3", fg="white", command=update_contact).grid(row=0, column=1, padx=5)
-tk.Button(button_frame, text="Delete", width=15, bg="#f44336", fg="white", command=delete_contact).grid(row=0, column=2, padx=5)
-
-
-# -------------------- SEARCH SECTION --------------------
-
-tk.Label(search_frame, text="Search (Name or Phone):", bg="#e6f2ff").grid(row=0, column=0, padx=5)
-
-entry_search = tk.Entry(search_frame, width=30)
-entry_search.grid(row=0, column=1, padx=5)
-
-tk.Button(search_frame, text="Search", width=10, command=search_contact).grid(row=0, column=2, padx=5)
-
-
-# -------------------- CONTACT LIST DISPLAY --------------------
-
-listbox = tk.Listbox(list_frame, width=70, height=10)
-listbox.pack()
-
-listbox.bind("<<ListboxSelect>>", fill_fields)
-
-# Show contacts when program starts
-view_contacts()
-
-
-# -------------------- RUN APPLICATION --------------------
-
-root.mainloop()
+# -------------------- IMPORT REQUIRED MODULES --------------------
+
+import sys                            # For the contacts file argument
+import tkinter as tk                  # For GUI
+from tkinter import messagebox        # For popup messages
+from tkinter import filedialog        # For choosing import and export files
+import contact_io                     # CSV and vCard files
+from contact_book import ContactBook, FILE_NAME, format_phone   # Contacts, indexes and storage
+from contact_search import MAX_RESULTS
+
+# -------------------- GUI CONFIGURATION --------------------
+
+SEARCH_DELAY = 150                    # Milliseconds to wait after a key press before searching
+
+
+class ContactManagerGUI:
+    """
+    Tkinter window over a ContactBook.
+    The book holds the contacts; the window only shows and edits them.
+    """
+
+    def __init__(self, root, filename=FILE_NAME):
+        self.root = root
+        self.book = ContactBook(filename)   # Load contacts when program starts
+
+        # Row i of the listbox shows the contact with id shown_ids[i], so a
+        # selection maps to its contact in O(1) in any filtered or sorted view
+        self.shown_ids = []
+        self.pending_search = None          # Scheduled search waiting for typing to pause
+        self.active_search = None           # Keyword of the search shown, or None for all contacts
+
+        self.create_widgets()
+        self.view_contacts()                # Show contacts when program starts
+
+    # -------------------- CREATE MAIN WINDOW --------------------
+
+    def create_widgets(self):
+        """
+        Builds the input fields, buttons, search box and contact list.
+        """
+        root = self.root
+        root.title("Contact Management System")
+        root.geometry("750x550")
+        root.configure(bg="#e6f2ff")   # Light blue background
+
+        # -------------------- CREATE FRAMES FOR BETTER LAYOUT --------------------
+
+        # Frame for input fields
+        input_frame = tk.Frame(root, bg="#e6f2ff")
+        input_frame.pack(pady=10)
+
+        # Frame for buttons
+        button_frame = tk.Frame(root, bg="#e6f2ff")
+        button_frame.pack(pady=10)
+
+        # Frame for search
+        search_frame = tk.Frame(root, bg="#e6f2ff")
+        search_frame.pack(pady=10)
+
+        # Frame for contact list
+        list_frame = tk.Frame(root, bg="#e6f2ff")
+        list_frame.pack(pady=10)
+
+        # -------------------- INPUT FIELDS --------------------
+
+        # Labels and Entry widgets arranged using grid
+
+        tk.Label(input_frame, text="Name:", bg="#e6f2ff", font=("Arial", 11)).grid(row=0, column=0, padx=5, pady=5)
+        self.entry_name = tk.Entry(input_frame, width=30)
+        self.entry_name.grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(input_frame, text="Phone:", bg="#e6f2ff", font=("Arial", 11)).grid(row=1, column=0, padx=5, pady=5)
+        self.entry_phone = tk.Entry(input_frame, width=30)
+        self.entry_phone.grid(row=1, column=1, padx=5, pady=5)
+
+        tk.Label(input_frame, text="Email:", bg="#e6f2ff", font=("Arial", 11)).grid(row=2, column=0, padx=5, pady=5)
+        self.entry_email = tk.Entry(input_frame, width=30)
+        self.entry_email.grid(row=2, column=1, padx=5, pady=5)
+
+        tk.Label(input_frame, text="Address:", bg="#e6f2ff", font=("Arial", 11)).grid(row=3, column=0, padx=5, pady=5)
+        self.entry_address = tk.Entry(input_frame, width=30)
+        self.entry_address.grid(row=3, column=1, padx=5, pady=5)
+
+        # -------------------- BUTTONS --------------------
+
+        tk.Button(button_frame, text="Add", width=15, bg="#4CAF50", fg="white", command=self.add_contact).grid(row=0, column=0, padx=5)
+        tk.Button(button_frame, text="Update", width=15, bg="#2196F3", fg="white", command=self.update_contact).grid(row=0, column=1, padx=5)
+        tk.Button(button_frame, text="Delete", width=15, bg="#f44336", fg="white", command=self.delete_contact).grid(row=0, column=2, padx=5)
+        tk.Button(button_frame, text="Import", width=10, command=self.import_contacts).grid(row=0, column=3, padx=5)
+        tk.Button(button_frame, text="Export", width=10, command=self.export_contacts).grid(row=0, column=4, padx=5)
+
+        # -------------------- SEARCH SECTION --------------------
+
+        tk.Label(search_frame, text="Search (Name or Phone):", bg="#e6f2ff").grid(row=0, column=0, padx=5)
+
+        self.entry_search = tk.Entry(search_frame, width=30)
+        self.entry_search.grid(row=0, column=1, padx=5)
+
+        tk.Button(search_frame, text="Search", width=10, command=self.search_contact).grid(row=0, column=2, padx=5)
+
+        self.entry_search.bind("<KeyRelease>", self.on_search_typed)
+
+        # -------------------- CONTACT LIST DISPLAY --------------------
+
+        self.listbox = tk.Listbox(list_frame, width=70, height=10)
+        self.listbox.pack()
+
+        self.result_label = tk.Label(list_frame, text="", bg="#e6f2ff")
+        self.result_label.pack()
+
+        self.listbox.bind("<<ListboxSelect>>", self.fill_fields)
+
+    # -------------------- FUNCTION TO ADD CONTACT --------------------
+
+    def add_contact(self):
+        """
+        Adds a new contact with a new id.
+        """
+        try:
+            contact_id = self.book.add(self.entry_name.get(), self.entry_phone.get(),
+                                       self.entry_email.get(), self.entry_address.get())
+        except ValueError as error:
+            # Name and phone are required and the phone must be new
+            messagebox.showerror("Error", str(error))
+            return
+
+        if self.active_search is None:
+            # New ids are the largest, so the contact goes at the end of the list
+            self.shown_ids.append(contact_id)
+            self.listbox.insert(tk.END, self.row_text(contact_id))
+            self.show_count()
+        else:
+            self.show_search(self.active_search)
+        self.clear_fields()      # Clear input fields
+        messagebox.showinfo("Success", "Contact Added Successfully!")
+
+    # -------------------- LISTBOX ROWS --------------------
+
+    def selected_row(self):
+        """
+        Returns the listbox row of the selected contact, or None.
+        """
+        selected = self.listbox.curselection()
+        if not selected or selected[0] >= len(self.shown_ids):
+            return None
+        return selected[0]
+
+    def selected_id(self):
+        """
+        Returns the id of the contact selected in the listbox, or None.
+        """
+        row = self.selected_row()
+        return None if row is None else self.shown_ids[row]
+
+    def row_text(self, contact_id):
+        """
+        Returns the listbox text of a contact.
+        """
+        contact = self.book.contacts[contact_id]
+        return f"{contact['name']}  |  {format_phone(contact['phone'])}"
+
+    def show_contacts(self, ids):
+        """
+        Shows the given contacts in the listbox and remembers their rows.
+        """
+        self.shown_ids = list(ids)
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *[self.row_text(contact_id) for contact_id in self.shown_ids])
+
+    def show_count(self):
+        """
+        Shows the number of contacts under the full list.
+        """
+        self.result_label.config(text=f"{len(self.book)} contacts")
+
+    def refresh_list(self):
+        """
+        Shows the active search again, or all contacts if there is none.
+        """
+        if self.active_search is None:
+            self.view_contacts()
+        else:
+            self.show_search(self.active_search)
+
+    # -------------------- FUNCTION TO VIEW CONTACTS --------------------
+
+    def view_contacts(self):
+        """
+        Displays all contacts in the listbox.
+        """
+        self.active_search = None
+        self.show_contacts(self.book.ids())
+        self.show_count()
+
+    # -------------------- FUNCTION TO SEARCH CONTACT --------------------
+
+    def search_contact(self):
+        """
+        Searches contacts by name or phone using the indexes.
+        Only the best MAX_RESULTS matches are shown.
+        """
+        self.pending_search = None
+        keyword = self.entry_search.get()
+
+        if keyword.strip() == "":
+            self.view_contacts()
+            return
+
+        self.show_search(keyword)
+
+    def show_search(self, keyword):
+        """
+        Shows the best matches of keyword and how many there are.
+        """
+        self.active_search = keyword
+        ids, total = self.book.search(keyword, MAX_RESULTS)
+        self.show_contacts(ids)
+
+        if total > len(ids):
+            self.result_label.config(text=f"Showing the best {len(ids)} of {total} matches")
+        else:
+            self.result_label.config(text=f"{total} match" if total == 1 else f"{total} matches")
+
+    def on_search_typed(self, event):
+        """
+        Searches as the user types, once typing pauses for SEARCH_DELAY ms.
+        """
+        if self.pending_search is not None:
+            self.root.after_cancel(self.pending_search)
+        self.pending_search = self.root.after(SEARCH_DELAY, self.search_contact)
+
+    # -------------------- FUNCTION TO UPDATE CONTACT --------------------
+
+    def update_contact(self):
+        """
+        Updates selected contact details.
+        """
+        row = self.selected_row()
+
+        if row is None:
+            messagebox.showerror("Error", "Select a contact to update")
+            return
+
+        contact_id = self.shown_ids[row]
+
+        try:
+            self.book.update(contact_id, self.entry_name.get(), self.entry_phone.get(),
+                             self.entry_email.get(), self.entry_address.get())
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
+
+        if self.active_search is None:
+            # Only this contact's row changes
+            self.listbox.delete(row)
+            self.listbox.insert(row, self.row_text(contact_id))
+        else:
+            # The contact may no longer match, or rank elsewhere
+            self.show_search(self.active_search)
+        self.clear_fields()
+        messagebox.showinfo("Success", "Contact Updated Successfully!")
+
+    # -------------------- FUNCTION TO DELETE CONTACT --------------------
+
+    def delete_contact(self):
+        """
+        Deletes selected contact.
+        """
+        row = self.selected_row()
+
+        if row is None:
+            messagebox.showerror("Error", "Select a contact to delete")
+            return
+
+        self.book.delete(self.shown_ids[row])
+
+        if self.active_search is None:
+            del self.shown_ids[row]
+            self.listbox.delete(row)
+            self.show_count()
+        else:
+            # A match beyond the shown ones may move up
+            self.show_search(self.active_search)
+        self.clear_fields()
+        messagebox.showinfo("Success", "Contact Deleted Successfully!")
+
+    # -------------------- IMPORT AND EXPORT --------------------
+
+    def import_contacts(self):
+        """
+        Adds the contacts of a CSV or vCard file, saving once at the end.
+        Numbers already in the book are skipped.
+        """
+        path = filedialog.askopenfilename(title="Import Contacts",
+                                          filetypes=[("Contacts", "*.csv *.vcf *.vcard"), ("All files", "*.*")])
+        if not path:
+            return
+
+        try:
+            added, duplicates, invalid = self.book.import_contacts(contact_io.read_contacts(path))
+        except (OSError, ValueError, UnicodeDecodeError) as error:
+            messagebox.showerror("Error", f"Could not import {path}:\n{error}")
+            return
+
+        self.refresh_list()
+        messagebox.showinfo("Success", f"Imported {added} contacts.\n"
+                                       f"Skipped {duplicates} duplicate numbers and {invalid} rows without name or phone.")
+
+    def export_contacts(self):
+        """
+        Writes all contacts to a CSV or vCard 4.0 file.
+        """
+        path = filedialog.asksaveasfilename(title="Export Contacts", defaultextension=".vcf",
+                                            filetypes=[("vCard", "*.vcf"), ("CSV", "*.csv")])
+        if not path:
+            return
+
+        try:
+            count = contact_io.write_contacts(self.book.contacts.values(), path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Error", f"Could not export {path}:\n{error}")
+            return
+
+        messagebox.showinfo("Success", f"Exported {count} contacts.")
+
+    # -------------------- FILL FIELDS WHEN CONTACT IS SELECTED --------------------
+
+    def fill_fields(self, event):
+        """
+        When user selects a contact from list,
+        automatically fill input fields.
+        """
+        contact_id = self.selected_id()
+
+        if contact_id is not None:
+            contact = self.book.get(contact_id)
+
+            self.entry_name.delete(0, tk.END)
+            self.entry_name.insert(0, contact["name"])
+
+            self.entry_phone.delete(0, tk.END)
+            self.entry_phone.insert(0, format_phone(contact["phone"]))
+
+            self.entry_email.delete(0, tk.END)
+            self.entry_email.insert(0, contact["email"])
+
+            self.entry_address.delete(0, tk.END)
+            self.entry_address.insert(0, contact["address"])
+
+    # -------------------- CLEAR INPUT FIELDS --------------------
+
+    def clear_fields(self):
+        """
+        Clears the contact input fields; the search stays as it is.
+        """
+        self.entry_name.delete(0, tk.END)
+        self.entry_phone.delete(0, tk.END)
+        self.entry_email.delete(0, tk.END)
+        self.entry_address.delete(0, tk.END)
+
+
+# -------------------- RUN APPLICATION --------------------
+
+def main():
+    """
+    Opens the window on contacts.json, or on the file given as argument.
+    """
+    filename = sys.argv[1] if len(sys.argv) > 1 else FILE_NAME
+    root = tk.Tk()
+    ContactManagerGUI(root, filename)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# -------------------- IMPORT REQUIRED MODULES --------------------
+
+import heapq                          # For picking the top matches
+import re                             # For stripping non-digits
+from array import array               # Compact posting lists
+from bisect import bisect_left, insort
+
+
+# -------------------- SEARCH CONFIGURATION --------------------
+
+GRAM_SIZE = 3                         # Substring queries use trigrams
+MAX_RESULTS = 200                     # Matches shown for one search
+
+NON_DIGITS = re.compile(r"\D")
+
+
+def digits_only(text):
+    """
+    Returns only the digits of text, e.g. "+1 (555) 010" -> "1555010".
+    """
+    return NON_DIGITS.sub("", text)
+
+
+# -------------------- N-GRAM INDEX --------------------
+
+class NgramIndex:
+    """
+    Substring index over one text per key.
+
+    Every trigram of a text maps to a sorted array of the keys whose
+    text contains it. A query of three or more characters starts from
+    the rarest of its trigrams and only checks those candidates, so it
+    never scans every text. Shorter queries match the start of a word
+    through a sorted list of the distinct words instead.
+    """
+
+    def __init__(self):
+        self.texts = {}               # key -> indexed text
+        self.grams = {}               # trigram -> array of keys
+        self.words = {}               # word -> array of keys
+        self.sorted_words = None      # distinct words, sorted when first needed
+
+    def build(self, items):
+        """
+        Indexes (key, text) pairs in increasing key order in one pass,
+        which is much faster than calling add() for each of them.
+        """
+        texts = self.texts
+        grams = {}
+        words = {}
+        for key, text in items:
+            texts[key] = text
+            # Same as self._grams(text), inlined for speed
+            for gram in {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}:
+                keys = grams.get(gram)
+                if keys is None:
+                    grams[gram] = [key]
+                else:
+                    keys.append(key)
+            for word in set(text.split()):
+                keys = words.get(word)
+                if keys is None:
+                    words[word] = [key]
+                else:
+                    keys.append(key)
+        self.grams = {gram: array("I", keys) for gram, keys in grams.items()}
+        self.words = {word: array("I", keys) for word, keys in words.items()}
+        self.sorted_words = None
+
+    def add(self, key, text):
+        """
+        Indexes text under key.
+        """
+        self.texts[key] = text
+        for gram in self._grams(text):
+            self._post(self.grams, gram, key)
+        for word in set(text.split()):
+            if self._post(self.words, word, key) and self.sorted_words is not None:
+                insort(self.sorted_words, word)
+
+    def remove(self, key):
+        """
+        Forgets the text of key.
+        """
+        text = self.texts.pop(key, None)
+        if text is None:
+            return
+        for gram in self._grams(text):
+            self._unpost(self.grams, gram, key)
+        for word in set(text.split()):
+            if self._unpost(self.words, word, key) and self.sorted_words is not None:
+                del self.sorted_words[bisect_left(self.sorted_words, word)]
+
+    def _post(self, postings, term, key):
+        """
+        Adds key to the postings of term; returns True if term is new.
+        """
+        keys = postings.get(term)
+        if keys is None:
+            postings[term] = array("I", [key])
+            return True
+        if keys[-1] < key:
+            keys.append(key)          # New keys are the largest: stays sorted
+        else:
+            insort(keys, key)
+        return False
+
+    def _unpost(self, postings, term, key):
+        """
+        Removes key from the postings of term; returns True if term is gone.
+        """
+        keys = postings[term]
+        del keys[bisect_left(keys, key)]
+        if not keys:
+            del postings[term]
+            return True
+        return False
+
+    def _grams(self, text):
+        return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+    def search(self, query):
+        """
+        Returns the set of keys whose text contains query
+        (or, for queries shorter than a trigram, has a word starting with it).
+        """
+        if not query:
+            return set()
+        if len(query) < GRAM_SIZE:
+            if self.sorted_words is None:
+                self.sorted_words = sorted(self.words)
+            words = self.sorted_words
+            index = bisect_left(words, query)
+            found = set()
+            while index < len(words) and words[index].startswith(query):
+                found.update(self.words[words[index]])
+                index += 1
+            return found
+        postings = []
+        for gram in self._grams(query):
+            keys = self.grams.get(gram)
+            if keys is None:
+                return set()
+            postings.append(keys)
+        rarest = min(postings, key=len)
+        texts = self.texts
+        return {key for key in rarest if query in texts[key]}
+
+
+# -------------------- CONTACT SEARCH --------------------
+
+class ContactSearch:
+    """
+    Name and phone indexes for contacts, each contact under a key.
+
+    Names are indexed lowercased; phone numbers by their digits only,
+    so "555 0102" finds "(555) 010-2000".
+    """
+
+    def __init__(self):
+        self.names = NgramIndex()
+        self.phones = NgramIndex()
+
+    def build(self, contacts):
+        """
+        Indexes (key, contact) pairs given in increasing key order.
+        """
+        contacts = list(contacts)
+        self.names.build((key, contact["name"].lower()) for key, contact in contacts)
+        self.phones.build((key, digits_only(contact["phone"])) for key, contact in contacts)
+
+    def add(self, key, contact):
+        self.names.add(key, contact["name"].lower())
+        self.phones.add(key, digits_only(contact["phone"]))
+
+    def remove(self, key):
+        self.names.remove(key)
+        self.phones.remove(key)
+
+    def search(self, keyword, limit=MAX_RESULTS):
+        """
+        Returns (keys of the best matches, total number of matches).
+
+        A keyword without letters also matches phone numbers. Names
+        starting with the keyword come first, then names with a word
+        starting with it, then other matches, each alphabetically.
+        """
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return [], 0
+        found = self.names.search(keyword)
+        digits = digits_only(keyword)
+        if digits and not any(char.isalpha() for char in keyword):
+            found |= self.phones.search(digits)
+        names = self.names.texts
+
+        def rank(key):
+            name = names[key]
+            if name.startswith(keyword):
+                return (0, name, key)
+            if (" " + keyword) in name:
+                return (1, name, key)
+            return (2, name, key)
+
+        return heapq.nsmallest(limit, found, key=rank), len(found)